@@ -7,7 +7,11 @@ CREATE TABLE OWNER (
     name VARCHAR(100) NOT NULL,
     phone VARCHAR(20),
     email VARCHAR(100) UNIQUE,
-    bank_details VARCHAR(255)
+    bank_details VARCHAR(255),
+    -- Version marker for the listing snapshot (owner contact is shown on listings)
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    INDEX idx_owner_updated_at (updated_at)
 );
 
 -- 2. TENANT Table
@@ -29,8 +33,11 @@ CREATE TABLE PROPERTY (
     sq_footage INT,
     monthly_rent DECIMAL(10, 2) NOT NULL,
     status ENUM('Available', 'Rented', 'Maintenance') NOT NULL,
+    -- Version marker for the listing snapshot
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     
-    FOREIGN KEY (owner_id) REFERENCES OWNER(owner_id)
+    FOREIGN KEY (owner_id) REFERENCES OWNER(owner_id),
+    INDEX idx_property_updated_at (updated_at)
 );
 
 -- 4. OCCUPANCY Table (Resolves TENANT <-> PROPERTY N:M)
@@ -71,5 +78,58 @@ CREATE TABLE PAYMENTS (
     method VARCHAR(50),
     status ENUM('Paid', 'Pending', 'Late') NOT NULL,
 
-    FOREIGN KEY (occupancy_id) REFERENCES OCCUPANCY(occupancy_id)
-);
\ No newline at end of file
+    FOREIGN KEY (occupancy_id) REFERENCES OCCUPANCY(occupancy_id),
+    -- Date-bounded payment history and per-occupancy ledger aggregates
+    INDEX idx_payments_occupancy_date (occupancy_id, payment_date)
+);
+
+-- 7. CHANGE_OUTBOX Table (Change events for cross-process cache invalidation)
+CREATE TABLE CHANGE_OUTBOX (
+    event_id BIGINT PRIMARY KEY AUTO_INCREMENT, -- Also the event's version
+    table_name VARCHAR(32) NOT NULL,
+    row_key INT NOT NULL,                       -- Primary key of the changed row
+    property_id INT NULL,                       -- Affected property, when there is one
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX idx_outbox_created_at (created_at)
+);
+
+-- 8. GLOBAL_COUNTERS Table (Single row of platform-wide counts, maintained by triggers)
+CREATE TABLE GLOBAL_COUNTERS (
+    counter_id TINYINT PRIMARY KEY DEFAULT 1,
+    total_users INT NOT NULL DEFAULT 0,
+    total_properties INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO GLOBAL_COUNTERS (counter_id) VALUES (1);
+
+-- 9. OWNER_COUNTERS Table (Per-owner property counts, maintained by triggers)
+CREATE TABLE OWNER_COUNTERS (
+    owner_id INT PRIMARY KEY,
+    total_properties INT NOT NULL DEFAULT 0,
+    rented_properties INT NOT NULL DEFAULT 0,
+    available_properties INT NOT NULL DEFAULT 0
+);
+
+-- 10. PROFILER_ROUTES Table (Routes sampled by the request profiler, shared by all workers)
+CREATE TABLE PROFILER_ROUTES (
+    route VARCHAR(255) PRIMARY KEY,             -- Flask url rule, e.g. '/api/tenant/rentals'
+    sample_rate DECIMAL(4, 3) NOT NULL
+);
+
+-- 11. PROFILER_STACKS Table (Folded stacks summed over every worker's samples)
+CREATE TABLE PROFILER_STACKS (
+    stack VARCHAR(512) PRIMARY KEY,
+    microseconds BIGINT NOT NULL DEFAULT 0
+);
+
+-- 12. PROFILER_ROUTE_TOTALS Table (Per-route sums behind the profiler summary)
+CREATE TABLE PROFILER_ROUTE_TOTALS (
+    route VARCHAR(255) PRIMARY KEY,
+    samples INT NOT NULL DEFAULT 0,
+    wall DOUBLE NOT NULL DEFAULT 0,
+    db_wait DOUBLE NOT NULL DEFAULT 0,
+    python_cpu DOUBLE NOT NULL DEFAULT 0,
+    serialization DOUBLE NOT NULL DEFAULT 0,
+    queries INT NOT NULL DEFAULT 0
+);
@@ -0,0 +1,79 @@
+-- Migrations for databases created from an earlier version of the DDL script.
+-- Fresh installs get all of this from DBMS_PropertyRental_MiniProject_DDL_Commands.sql.
+-- Run the sections added since your database was created, in order.
+
+-- ---
+-- 1. Listing snapshot version markers (listing_snapshot.py)
+-- ---
+ALTER TABLE OWNER
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_owner_updated_at (updated_at);
+
+ALTER TABLE PROPERTY
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_property_updated_at (updated_at);
+
+-- ---
+-- 2. Tenant ledger / paginated payment history
+-- ---
+ALTER TABLE PAYMENTS
+    ADD INDEX idx_payments_occupancy_date (occupancy_id, payment_date);
+
+-- ---
+-- 3. Change outbox for cross-process cache invalidation (cache_sync.py)
+-- Create the table below, then run the CHANGE OUTBOX section of
+-- DBMS_PropertyRental_MiniProject_Trigger_Procedure_Function.sql (inside DELIMITER //).
+-- ---
+CREATE TABLE CHANGE_OUTBOX (
+    event_id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    table_name VARCHAR(32) NOT NULL,
+    row_key INT NOT NULL,
+    property_id INT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX idx_outbox_created_at (created_at)
+);
+
+-- ---
+-- 4. Trigger-maintained dashboard counters
+-- Create the tables below, run the DASHBOARD COUNTERS section of
+-- DBMS_PropertyRental_MiniProject_Trigger_Procedure_Function.sql, then fill them:
+--     CALL sp_rebuild_counters();
+-- ---
+CREATE TABLE GLOBAL_COUNTERS (
+    counter_id TINYINT PRIMARY KEY DEFAULT 1,
+    total_users INT NOT NULL DEFAULT 0,
+    total_properties INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE OWNER_COUNTERS (
+    owner_id INT PRIMARY KEY,
+    total_properties INT NOT NULL DEFAULT 0,
+    rented_properties INT NOT NULL DEFAULT 0,
+    available_properties INT NOT NULL DEFAULT 0
+);
+
+-- ---
+-- 5. Request profiler shared by all workers (profiler.py)
+-- Create the tables below, then run the PROFILER_ROUTES triggers in the CHANGE OUTBOX
+-- section of DBMS_PropertyRental_MiniProject_Trigger_Procedure_Function.sql.
+-- ---
+CREATE TABLE PROFILER_ROUTES (
+    route VARCHAR(255) PRIMARY KEY,
+    sample_rate DECIMAL(4, 3) NOT NULL
+);
+
+CREATE TABLE PROFILER_STACKS (
+    stack VARCHAR(512) PRIMARY KEY,
+    microseconds BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE PROFILER_ROUTE_TOTALS (
+    route VARCHAR(255) PRIMARY KEY,
+    samples INT NOT NULL DEFAULT 0,
+    wall DOUBLE NOT NULL DEFAULT 0,
+    db_wait DOUBLE NOT NULL DEFAULT 0,
+    python_cpu DOUBLE NOT NULL DEFAULT 0,
+    serialization DOUBLE NOT NULL DEFAULT 0,
+    queries INT NOT NULL DEFAULT 0
+);
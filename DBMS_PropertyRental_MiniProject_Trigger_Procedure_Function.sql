@@ -186,4 +186,362 @@ BEGIN
 END;
 //
 
+--                         CHANGE OUTBOX                        
+
+-- ---
+-- Every insert, update and delete on the application tables appends a
+-- compact (table, key, property) event to CHANGE_OUTBOX; the event_id is the
+-- event's version. App workers poll the outbox (cache_sync.py) to invalidate
+-- their in-process caches. Writes made by the triggers and procedures above
+-- (e.g. sp_checkout_tenant setting end_date, which flips PROPERTY.status) are
+-- captured too, because they fire these triggers on the tables they modify.
+-- Requires MySQL 5.7.2+ (several triggers per table and event).
+-- ---
+
+-- PROPERTY (listings and analytics)
+CREATE TRIGGER trg_outbox_property_insert
+AFTER INSERT ON PROPERTY
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PROPERTY', NEW.property_id, NEW.property_id);
+END;
+//
+
+CREATE TRIGGER trg_outbox_property_update
+AFTER UPDATE ON PROPERTY
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PROPERTY', NEW.property_id, NEW.property_id);
+END;
+//
+
+CREATE TRIGGER trg_outbox_property_delete
+AFTER DELETE ON PROPERTY
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PROPERTY', OLD.property_id, OLD.property_id);
+END;
+//
+
+-- OWNER (owner contact shown on listings)
+CREATE TRIGGER trg_outbox_owner_insert
+AFTER INSERT ON OWNER
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('OWNER', NEW.owner_id, NULL);
+END;
+//
+
+CREATE TRIGGER trg_outbox_owner_update
+AFTER UPDATE ON OWNER
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('OWNER', NEW.owner_id, NULL);
+END;
+//
+
+CREATE TRIGGER trg_outbox_owner_delete
+AFTER DELETE ON OWNER
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('OWNER', OLD.owner_id, NULL);
+END;
+//
+
+-- TENANT (user lists)
+CREATE TRIGGER trg_outbox_tenant_insert
+AFTER INSERT ON TENANT
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('TENANT', NEW.tenant_id, NULL);
+END;
+//
+
+CREATE TRIGGER trg_outbox_tenant_update
+AFTER UPDATE ON TENANT
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('TENANT', NEW.tenant_id, NULL);
+END;
+//
+
+CREATE TRIGGER trg_outbox_tenant_delete
+AFTER DELETE ON TENANT
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('TENANT', OLD.tenant_id, NULL);
+END;
+//
+
+-- OCCUPANCY (tenancy periods)
+CREATE TRIGGER trg_outbox_occupancy_insert
+AFTER INSERT ON OCCUPANCY
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('OCCUPANCY', NEW.occupancy_id, NEW.property_id);
+END;
+//
+
+CREATE TRIGGER trg_outbox_occupancy_update
+AFTER UPDATE ON OCCUPANCY
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('OCCUPANCY', NEW.occupancy_id, NEW.property_id);
+END;
+//
+
+CREATE TRIGGER trg_outbox_occupancy_delete
+AFTER DELETE ON OCCUPANCY
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('OCCUPANCY', OLD.occupancy_id, OLD.property_id);
+END;
+//
+
+-- REVIEW (ratings)
+CREATE TRIGGER trg_outbox_review_insert
+AFTER INSERT ON REVIEW
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('REVIEW', NEW.review_id, NEW.property_id);
+END;
+//
+
+CREATE TRIGGER trg_outbox_review_update
+AFTER UPDATE ON REVIEW
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('REVIEW', NEW.review_id, NEW.property_id);
+END;
+//
+
+CREATE TRIGGER trg_outbox_review_delete
+AFTER DELETE ON REVIEW
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('REVIEW', OLD.review_id, OLD.property_id);
+END;
+//
+
+-- PAYMENTS (ledger and analytics)
+CREATE TRIGGER trg_outbox_payments_insert
+AFTER INSERT ON PAYMENTS
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PAYMENTS', NEW.payment_id, (SELECT property_id FROM OCCUPANCY WHERE occupancy_id = NEW.occupancy_id));
+END;
+//
+
+CREATE TRIGGER trg_outbox_payments_update
+AFTER UPDATE ON PAYMENTS
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PAYMENTS', NEW.payment_id, (SELECT property_id FROM OCCUPANCY WHERE occupancy_id = NEW.occupancy_id));
+END;
+//
+
+CREATE TRIGGER trg_outbox_payments_delete
+AFTER DELETE ON PAYMENTS
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PAYMENTS', OLD.payment_id, (SELECT property_id FROM OCCUPANCY WHERE occupancy_id = OLD.occupancy_id));
+END;
+//
+
+-- PROFILER_ROUTES (request profiler configuration; the route is not an INT key)
+CREATE TRIGGER trg_outbox_profiler_routes_insert
+AFTER INSERT ON PROFILER_ROUTES
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PROFILER_ROUTES', 0, NULL);
+END;
+//
+
+CREATE TRIGGER trg_outbox_profiler_routes_update
+AFTER UPDATE ON PROFILER_ROUTES
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PROFILER_ROUTES', 0, NULL);
+END;
+//
+
+CREATE TRIGGER trg_outbox_profiler_routes_delete
+AFTER DELETE ON PROFILER_ROUTES
+FOR EACH ROW
+BEGIN
+    INSERT INTO CHANGE_OUTBOX (table_name, row_key, property_id)
+    VALUES ('PROFILER_ROUTES', 0, NULL);
+END;
+//
+
+-- ---
+-- Compaction: drop outbox events older than a day, every hour.
+-- Requires the event scheduler: SET GLOBAL event_scheduler = ON;
+-- ---
+CREATE EVENT evt_compact_change_outbox
+ON SCHEDULE EVERY 1 HOUR
+DO
+BEGIN
+    DELETE FROM CHANGE_OUTBOX WHERE created_at < NOW() - INTERVAL 1 DAY;
+END;
+//
+
+--                       DASHBOARD COUNTERS                     
+
+-- ---
+-- GLOBAL_COUNTERS / OWNER_COUNTERS stay exact through the triggers below, so
+-- the admin and owner stats cards are single-row primary-key reads.
+-- OCCUPANCY needs no counter triggers of its own: moving in and checking out
+-- change PROPERTY.status (trg_update_property_status / trg_update_status_on_checkout),
+-- and that UPDATE fires trg_counters_property_update.
+-- sp_rebuild_counters recomputes everything from scratch.
+-- ---
+
+-- OWNER
+CREATE TRIGGER trg_counters_owner_insert
+AFTER INSERT ON OWNER
+FOR EACH ROW
+BEGIN
+    UPDATE GLOBAL_COUNTERS SET total_users = total_users + 1 WHERE counter_id = 1;
+
+    INSERT INTO OWNER_COUNTERS (owner_id) VALUES (NEW.owner_id)
+    ON DUPLICATE KEY UPDATE owner_id = owner_id;
+END;
+//
+
+CREATE TRIGGER trg_counters_owner_delete
+AFTER DELETE ON OWNER
+FOR EACH ROW
+BEGIN
+    UPDATE GLOBAL_COUNTERS SET total_users = total_users - 1 WHERE counter_id = 1;
+
+    DELETE FROM OWNER_COUNTERS WHERE owner_id = OLD.owner_id;
+END;
+//
+
+-- TENANT
+CREATE TRIGGER trg_counters_tenant_insert
+AFTER INSERT ON TENANT
+FOR EACH ROW
+BEGIN
+    UPDATE GLOBAL_COUNTERS SET total_users = total_users + 1 WHERE counter_id = 1;
+END;
+//
+
+CREATE TRIGGER trg_counters_tenant_delete
+AFTER DELETE ON TENANT
+FOR EACH ROW
+BEGIN
+    UPDATE GLOBAL_COUNTERS SET total_users = total_users - 1 WHERE counter_id = 1;
+END;
+//
+
+-- PROPERTY
+CREATE TRIGGER trg_counters_property_insert
+AFTER INSERT ON PROPERTY
+FOR EACH ROW
+BEGIN
+    UPDATE GLOBAL_COUNTERS SET total_properties = total_properties + 1 WHERE counter_id = 1;
+
+    INSERT INTO OWNER_COUNTERS (owner_id, total_properties, rented_properties, available_properties)
+    VALUES (NEW.owner_id, 1, NEW.status = 'Rented', NEW.status = 'Available')
+    ON DUPLICATE KEY UPDATE
+        total_properties = total_properties + 1,
+        rented_properties = rented_properties + (NEW.status = 'Rented'),
+        available_properties = available_properties + (NEW.status = 'Available');
+END;
+//
+
+CREATE TRIGGER trg_counters_property_update
+AFTER UPDATE ON PROPERTY
+FOR EACH ROW
+BEGIN
+    -- Only a status or owner change moves a property between counters
+    IF OLD.status <> NEW.status OR OLD.owner_id <> NEW.owner_id THEN
+        UPDATE OWNER_COUNTERS
+        SET total_properties = total_properties - 1,
+            rented_properties = rented_properties - (OLD.status = 'Rented'),
+            available_properties = available_properties - (OLD.status = 'Available')
+        WHERE owner_id = OLD.owner_id;
+
+        INSERT INTO OWNER_COUNTERS (owner_id, total_properties, rented_properties, available_properties)
+        VALUES (NEW.owner_id, 1, NEW.status = 'Rented', NEW.status = 'Available')
+        ON DUPLICATE KEY UPDATE
+            total_properties = total_properties + 1,
+            rented_properties = rented_properties + (NEW.status = 'Rented'),
+            available_properties = available_properties + (NEW.status = 'Available');
+    END IF;
+END;
+//
+
+CREATE TRIGGER trg_counters_property_delete
+AFTER DELETE ON PROPERTY
+FOR EACH ROW
+BEGIN
+    UPDATE GLOBAL_COUNTERS SET total_properties = total_properties - 1 WHERE counter_id = 1;
+
+    UPDATE OWNER_COUNTERS
+    SET total_properties = total_properties - 1,
+        rented_properties = rented_properties - (OLD.status = 'Rented'),
+        available_properties = available_properties - (OLD.status = 'Available')
+    WHERE owner_id = OLD.owner_id;
+END;
+//
+
+-- ---
+-- STORED PROCEDURE: Rebuild Dashboard Counters
+-- Reconciliation: recomputes every counter from the base tables.
+-- Run after bulk loads done with triggers disabled, or to verify drift:
+--     CALL sp_rebuild_counters();   (or: flask --app app rebuild-counters)
+-- ---
+CREATE PROCEDURE sp_rebuild_counters()
+BEGIN
+    START TRANSACTION;
+
+    INSERT INTO GLOBAL_COUNTERS (counter_id, total_users, total_properties)
+    VALUES (
+        1,
+        (SELECT COUNT(*) FROM OWNER) + (SELECT COUNT(*) FROM TENANT),
+        (SELECT COUNT(*) FROM PROPERTY)
+    )
+    ON DUPLICATE KEY UPDATE
+        total_users = VALUES(total_users),
+        total_properties = VALUES(total_properties);
+
+    DELETE FROM OWNER_COUNTERS;
+
+    INSERT INTO OWNER_COUNTERS (owner_id, total_properties, rented_properties, available_properties)
+    SELECT
+        o.owner_id,
+        COUNT(p.property_id),
+        COALESCE(SUM(p.status = 'Rented'), 0),
+        COALESCE(SUM(p.status = 'Available'), 0)
+    FROM OWNER o
+    LEFT JOIN PROPERTY p ON p.owner_id = o.owner_id
+    GROUP BY o.owner_id;
+
+    COMMIT;
+END;
+//
+
 DELIMITER ;
@@ -0,0 +1,249 @@
+import os
+import re
+import threading
+import time
+from datetime import date
+
+import numpy as np
+
+# Cached reports are reused while the data version is unchanged, but never longer than this
+ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', '300'))
+MAX_MONTHS = 60
+# Occupancy rows intersected with the month windows at a time (bounds the rows x months temporaries)
+OCCUPANCY_CHUNK = 4096
+# month_year is free-form VARCHAR; rows that are not a real YYYY-MM month are left out of the report
+MONTH_YEAR_PATTERN = '^[0-9]{4}-(0[1-9]|1[0-2])$'
+MONTH_YEAR_RE = re.compile(MONTH_YEAR_PATTERN)
+
+# Cheap fingerprint of the tables the report reads; any insert, delete,
+# check-out or payment changes at least one of these values.
+VERSION_QUERY = """
+SELECT
+    (SELECT COUNT(*) FROM PROPERTY) AS properties,
+    (SELECT COALESCE(MAX(property_id), 0) FROM PROPERTY) AS max_property_id,
+    (SELECT COUNT(*) FROM OCCUPANCY) AS occupancies,
+    (SELECT COUNT(end_date) FROM OCCUPANCY) AS closed_occupancies,
+    (SELECT COUNT(*) FROM PAYMENTS) AS payments,
+    (SELECT COALESCE(MAX(payment_id), 0) FROM PAYMENTS) AS max_payment_id
+"""
+
+
+class PortfolioAnalytics:
+    """
+    Occupancy and yield metrics for one owner's portfolio or the whole platform.
+    Rows are bulk-loaded once into NumPy arrays; every metric is computed with
+    broadcasting over (property, month) matrices instead of per-row loops.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._cache = {}  # (owner_id, months) -> (version, computed_at, report)
+
+    def clear(self):
+        with self._lock:
+            self._cache = {}
+
+    def report(self, owner_id=None, months=12):
+        """Return the cached report for this data version, recomputing if needed"""
+        months = min(max(int(months), 1), MAX_MONTHS)
+        version_result = self.db.execute_query(VERSION_QUERY, ())
+        if not version_result['success']:
+            return version_result
+        version = tuple(version_result['data'][0].values()) if version_result['data'] else ()
+
+        key = (owner_id, months)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and cached[0] == version and time.time() - cached[1] < ANALYTICS_CACHE_TTL:
+            return {'success': True, 'data': cached[2], 'messages': []}
+
+        today = date.today()
+        loaded = self._load(owner_id, months, today)
+        if not loaded['success']:
+            return loaded
+        report = compute_metrics(*loaded['data'], months=months, today=today)
+
+        with self._lock:
+            self._cache[key] = (version, time.time(), report)
+        return {'success': True, 'data': report, 'messages': []}
+
+    def _load(self, owner_id, months, today):
+        """
+        Bulk-load PROPERTY and the window's OCCUPANCY periods and Paid totals
+        per (property, month) in three queries
+        """
+        owner_filter = "WHERE p.owner_id = %s" if owner_id is not None else ""
+        params = (owner_id,) if owner_id is not None else ()
+        last_month = np.datetime64(today, 'M')
+        first_month = last_month - (months - 1)
+        window_start = first_month.astype('datetime64[D]').item()
+
+        properties = self.db.execute_query(f"""
+            SELECT p.property_id, p.city, p.sq_footage, p.monthly_rent
+            FROM PROPERTY p
+            {owner_filter}
+            ORDER BY p.property_id
+        """, params)
+        occupancies = self.db.execute_query(f"""
+            SELECT occ.property_id, occ.start_date, occ.end_date
+            FROM OCCUPANCY occ
+            JOIN PROPERTY p ON occ.property_id = p.property_id
+            WHERE (occ.end_date IS NULL OR occ.end_date >= %s)
+              {"AND p.owner_id = %s" if owner_id is not None else ""}
+        """, (window_start,) + params)
+        payments = self.db.execute_query(f"""
+            SELECT occ.property_id, pay.month_year, SUM(pay.amount) AS amount
+            FROM PAYMENTS pay
+            JOIN OCCUPANCY occ ON pay.occupancy_id = occ.occupancy_id
+            JOIN PROPERTY p ON occ.property_id = p.property_id
+            WHERE pay.status = 'Paid'
+              AND pay.month_year BETWEEN %s AND %s
+              AND pay.month_year REGEXP %s
+              {"AND p.owner_id = %s" if owner_id is not None else ""}
+            GROUP BY occ.property_id, pay.month_year
+        """, (str(first_month), str(last_month), MONTH_YEAR_PATTERN) + params)
+
+        for result in (properties, occupancies, payments):
+            if not result['success']:
+                return result
+        return {'success': True, 'data': (properties['data'], occupancies['data'], payments['data'])}
+
+
+def compute_metrics(properties, occupancies, payments, months, today):
+    """
+    Vacancy rate, average days vacant, revenue per sq. ft. and collection rate
+    per property (over the whole window) and per city (per month).
+    Occupancy periods are half-open [start_date, end_date); an open period runs through today.
+    """
+    last_month = np.datetime64(today, 'M')
+    month_starts = np.arange(last_month - (months - 1), last_month + 1)
+    month_labels = [str(m) for m in month_starts]
+    if not properties:
+        return {'months': month_labels, 'properties': [], 'cities': []}
+
+    # --- Property attributes ---
+    property_ids = np.array([row['property_id'] for row in properties], dtype=np.int64)
+    cities = np.array([row['city'] or 'Unknown' for row in properties], dtype=object)
+    sq_footage = np.array([row['sq_footage'] or 0 for row in properties], dtype=float)
+    monthly_rent = np.array([row['monthly_rent'] or 0 for row in properties], dtype=float)
+
+    # --- Month windows, the current month only counts up to today ---
+    tomorrow = np.datetime64(today, 'D') + 1
+    window_start = month_starts.astype('datetime64[D]')
+    window_end = np.minimum((month_starts + 1).astype('datetime64[D]'), tomorrow)
+    days_in_window = (window_end - window_start).astype(np.int64)
+    days_in_month = ((month_starts + 1).astype('datetime64[D]') - window_start).astype(np.int64)
+
+    # --- Occupied days: interval x month intersection, summed per property ---
+    occupied = np.zeros((len(property_ids), months), dtype=np.int64)
+    # The three loads are separate reads: drop rows of properties added after the PROPERTY one
+    occupancies = [occupancies[i] for i in np.flatnonzero(_known(property_ids, occupancies))]
+    if occupancies:
+        occ_rows = np.searchsorted(property_ids, [row['property_id'] for row in occupancies])
+        starts = np.array([row['start_date'] for row in occupancies], dtype='datetime64[D]')
+        ends = np.array([row['end_date'] for row in occupancies], dtype='datetime64[D]')
+        ends = np.where(np.isnat(ends), tomorrow, np.minimum(ends, tomorrow))
+
+        # Chunked so the (occupancies x months) intermediates stay small at platform scale
+        for first in range(0, len(occ_rows), OCCUPANCY_CHUNK):
+            chunk = slice(first, first + OCCUPANCY_CHUNK)
+            overlap = (
+                np.minimum(ends[chunk, None], window_end[None, :])
+                - np.maximum(starts[chunk, None], window_start[None, :])
+            ).astype(np.int64)
+            np.clip(overlap, 0, None, out=overlap)
+            np.add.at(occupied, occ_rows[chunk], overlap)
+        occupied = np.minimum(occupied, days_in_window[None, :])
+
+    vacant = days_in_window[None, :] - occupied
+    billed = monthly_rent[:, None] * occupied / days_in_month[None, :]
+
+    # --- Collected rent per (property, month) ---
+    collected = np.zeros((len(property_ids), months), dtype=float)
+    # Same check as MONTH_YEAR_PATTERN, for rows that did not come through _load()
+    payments = [row for row in payments if MONTH_YEAR_RE.match(row['month_year'] or '')]
+    payments = [payments[i] for i in np.flatnonzero(_known(property_ids, payments))]
+    if payments:
+        pay_rows = np.searchsorted(property_ids, [row['property_id'] for row in payments])
+        pay_months = np.array([row['month_year'] for row in payments], dtype='datetime64[M]')
+        amounts = np.array([row['amount'] for row in payments], dtype=float)
+        pay_cols = (pay_months - month_starts[0]).astype(np.int64)
+        in_window = (pay_cols >= 0) & (pay_cols < months)
+        np.add.at(collected, (pay_rows[in_window], pay_cols[in_window]), amounts[in_window])
+
+    # --- Per property, whole window ---
+    total_days = days_in_window.sum()
+    total_collected = collected.sum(axis=1)
+    total_billed = billed.sum(axis=1)
+    property_report = {
+        'vacancy_rate': vacant.sum(axis=1) / total_days,
+        'avg_days_vacant': vacant.mean(axis=1),
+        'revenue_per_sq_ft': _safe_divide(total_collected, sq_footage),
+        'collection_rate': _safe_divide(total_collected, total_billed),
+        'collected': total_collected,
+    }
+
+    # --- Per city, per month (group-by via inverse indices) ---
+    city_names, city_index = np.unique(cities.astype(str), return_inverse=True)
+    city_count = np.bincount(city_index, minlength=len(city_names))
+    city_sq_ft = np.bincount(city_index, weights=sq_footage, minlength=len(city_names))
+
+    def group_sum(matrix):
+        grouped = np.zeros((len(city_names), months), dtype=float)
+        np.add.at(grouped, city_index, matrix)
+        return grouped
+
+    city_vacant = group_sum(vacant)
+    city_collected = group_sum(collected)
+    city_billed = group_sum(billed)
+    city_report = {
+        'vacancy_rate': city_vacant / (city_count[:, None] * days_in_window[None, :]),
+        'avg_days_vacant': city_vacant / city_count[:, None],
+        'revenue_per_sq_ft': _safe_divide(city_collected, city_sq_ft[:, None]),
+        'collection_rate': _safe_divide(city_collected, city_billed),
+        'collected': city_collected,
+    }
+
+    return {
+        'months': month_labels,
+        'properties': [
+            {
+                'property_id': int(property_ids[i]),
+                'city': cities[i],
+                **{metric: _to_json(values[i]) for metric, values in property_report.items()},
+            }
+            for i in range(len(property_ids))
+        ],
+        'cities': [
+            {
+                'city': city_names[i],
+                'property_count': int(city_count[i]),
+                **{metric: _to_json(values[i]) for metric, values in city_report.items()},
+            }
+            for i in range(len(city_names))
+        ],
+    }
+
+
+def _known(property_ids, rows):
+    """Mask of the rows whose property_id is in the sorted property_ids"""
+    if not rows:
+        return np.zeros(0, dtype=bool)
+    row_ids = np.array([row['property_id'] for row in rows], dtype=np.int64)
+    positions = np.minimum(np.searchsorted(property_ids, row_ids), len(property_ids) - 1)
+    return property_ids[positions] == row_ids
+
+
+def _safe_divide(numerator, denominator):
+    numerator, denominator = np.broadcast_arrays(np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float))
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def _to_json(value):
+    """Round a scalar or series, turning NaN into None"""
+    values = np.round(np.atleast_1d(value).astype(float), 4)
+    cleaned = [None if np.isnan(v) else float(v) for v in values]
+    return cleaned if np.ndim(value) else cleaned[0]
@@ -1,5 +1,15 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, render_template, stream_template, request, jsonify, session, redirect, url_for, Response
 from database import Database
+from profiler import RequestProfiler
+import assets
+from analytics import PortfolioAnalytics
+from fragment_cache import FragmentCache
+from listing_snapshot import ListingSnapshot
+from cache_sync import ChangeFeed, property_ids
+from singleflight import SingleFlight
+from availability import AvailabilityIndex
+import queries
+import responses
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -10,66 +20,100 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'fallback_secret_key')
 
-db = Database()
+# Fingerprinted static assets (built with `python assets.py`)
+assets.init_app(app)
+
+# Autocommit so reads see other workers' commits (see cache_sync.py)
+db = Database(autocommit=True)
+
+# Vectorized occupancy / yield reports, cached per data version
+portfolio_analytics = PortfolioAnalytics(db)
+
+# Rendered home.html listing cards, keyed by (property_id, row version)
+listing_cards = FragmentCache('_property_card.html')
+
+# Sampling profiler, idle until an admin enables it for a route; configuration
+# and samples are shared by all workers through the PROFILER_* tables
+profiler = RequestProfiler(Database(autocommit=True))
+profiler.init_app(app, db, fragment_caches=[listing_cards])
+
+# Persisted listing data shared by all workers (see listing_snapshot.py)
+listing_snapshot = ListingSnapshot(db)
+
+# Searches are streamed: the page shell is sent at once, cards follow as rows arrive
+STREAM_SEARCH_RESULTS = os.getenv('STREAM_SEARCH_RESULTS', 'True') == 'True'
+SEARCH_STREAM_CHUNK = int(os.getenv('SEARCH_STREAM_CHUNK', '100'))
+
+# Expensive full-table reads: identical concurrent queries share one execution;
+# stale results are refreshed in the background on a connection of their own
+report_refresh_db = Database(autocommit=True)
+report_queries = SingleFlight(db, refresh_db=report_refresh_db)
+
+# Occupancy periods per property for date-range availability (see availability.py)
+availability = AvailabilityIndex(db)
+
+# Cross-process invalidation: every worker consumes the CHANGE_OUTBOX table
+change_feed = ChangeFeed(Database(autocommit=True))
+
+def _invalidate_listing_cards(events):
+    listing_cards.invalidate(*property_ids(events))
+
+change_feed.subscribe(['PROPERTY', 'OCCUPANCY', 'REVIEW'], _invalidate_listing_cards)
+change_feed.subscribe(['OWNER'], lambda events: listing_cards.clear())
+change_feed.subscribe(['PROPERTY', 'OWNER', 'REVIEW'], lambda events: listing_snapshot.mark_stale())
+change_feed.subscribe(['PROPERTY', 'OCCUPANCY', 'PAYMENTS'], lambda events: portfolio_analytics.clear())
+change_feed.subscribe(['PROPERTY', 'OWNER', 'TENANT', 'OCCUPANCY', 'REVIEW'], lambda events: report_queries.clear())
+change_feed.subscribe(['OCCUPANCY'], lambda events: availability.invalidate(*property_ids(events)))
+change_feed.subscribe(['PROFILER_ROUTES'], profiler.load_config)
 
 # Initialize database connection when app starts
 with app.app_context():
     db.connect()
+    report_refresh_db.connect()
+    listing_snapshot.load()
+    profiler.start()
+    change_feed.start()
+
+
+@app.after_request
+def apply_local_writes(response):
+    """Apply this worker's own writes to its caches now rather than on the next poll"""
+    if request.method in ('POST', 'PUT', 'DELETE') and request.path.startswith('/api/'):
+        change_feed.poll()
+    return response
 
 
 # ==================== PUBLIC HOME & AUTH ROUTES ====================
 
+def stream_listing_cards(query, params):
+    """Rendered cards for a listing query, one DB chunk in memory at a time"""
+    for rows in db.stream_query(query, params, SEARCH_STREAM_CHUNK):
+        yield from listing_cards.render_all(app.jinja_env, rows, 'property_id')
+
+
 @app.route('/', methods=['GET', 'POST'])
 def home():
     """NEW Public-facing homepage with property search."""
     
-    # Base query joins PROPERTY and OWNER tables
-    query = """
-        SELECT 
-            p.property_id, p.address, p.city, p.description, p.sq_footage, 
-            p.monthly_rent, p.status,
-            o.name as owner_name, 
-            o.email as owner_email, 
-            o.phone as owner_phone,
-            (SELECT AVG(r.rating) FROM REVIEW r WHERE r.property_id = p.property_id) as avg_rating
-        FROM PROPERTY p
-        JOIN OWNER o ON p.owner_id = o.owner_id
-    """
-    
-    params = []
-    conditions = []
-
-    if request.method == 'POST':
-        # Handle search logic from form
-        keyword = request.form.get('keyword', '')
-        city = request.form.get('city', '')
-        
-        if keyword:
-            conditions.append("(p.description LIKE %s OR p.address LIKE %s)")
-            params.extend([f"%{keyword}%", f"%{keyword}%"])
-            
-        if city:
-            conditions.append("p.city LIKE %s")
-            params.append(f"%{city}%")
-            
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-    else:
-        # Default GET request: Show only AVAILABLE properties
-        conditions.append("p.status = 'Available'")
-        query += " WHERE " + " AND ".join(conditions)
+    query, params = queries.home_search(request.form if request.method == 'POST' else None)
 
-    query += " ORDER BY p.monthly_rent ASC"
-    
     try:
-        result = db.execute_query(query, tuple(params))
-        properties = result['data'] if result['success'] else []
-        return render_template('home.html', properties=properties)
+        if request.method == 'GET' and listing_snapshot.ready:
+            # Default listing comes from the snapshot, no join per request
+            properties = listing_snapshot.home_rows()
+        elif STREAM_SEARCH_RESULTS:
+            # The query only starts once the shell up to the results list has been sent
+            return stream_template('home.html', cards=stream_listing_cards(query, params))
+        else:
+            result = db.execute_query(query, params)
+            properties = result['data'] if result['success'] else []
+        # Only new or changed listings are rendered, the rest come from the cache
+        cards = listing_cards.render_all(app.jinja_env, properties, 'property_id')
+        return render_template('home.html', cards=cards)
         
     except Exception as e:
         print(f"!!! ERROR in /: {e}")
-        return render_template('home.html', properties=[])
+        return render_template('home.html', cards=[])
 
 
 @app.route('/login')
@@ -107,10 +151,7 @@ def login():
         if not name or not email:
             return jsonify({'success': False, 'error': 'Name and Email are required'})
             
-        table = 'OWNER' if role == 'owner' else 'TENANT'
-        id_field = 'owner_id' if role == 'owner' else 'tenant_id'
-        
-        query = f"SELECT {id_field}, name, email FROM {table} WHERE name = %s AND email = %s"
+        query, id_field = queries.login_lookup(role)
         result = db.execute_query(query, (name, email))
         
         if result['success'] and len(result['data']) > 0:
@@ -141,12 +182,10 @@ def signup():
     
     if role == 'owner':
         bank_details = data.get('bank_details', '')
-        query = "INSERT INTO OWNER (name, email, phone, bank_details) VALUES (%s, %s, %s, %s)"
-        result = db.execute_query(query, (name, email, phone, bank_details), fetch=False)
+        result = db.execute_query(queries.SIGNUP_OWNER, (name, email, phone, bank_details), fetch=False)
     elif role == 'tenant':
         id_proof = data.get('id_proof', '')
-        query = "INSERT INTO TENANT (name, email, phone, id_proof) VALUES (%s, %s, %s, %s)"
-        result = db.execute_query(query, (name, email, phone, id_proof), fetch=False)
+        result = db.execute_query(queries.SIGNUP_TENANT, (name, email, phone, id_proof), fetch=False)
     else:
         return jsonify({'success': False, 'error': 'Invalid role'})
     
@@ -177,18 +216,8 @@ def admin_stats():
     if session.get('role') != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'})
     try:
-        query_users = "SELECT COUNT(*) AS count FROM (SELECT owner_id FROM OWNER UNION ALL SELECT tenant_id FROM TENANT) AS users"
-        users_result = db.execute_query(query_users, ())
-        
-        query_props = "SELECT COUNT(*) AS count FROM PROPERTY"
-        props_result = db.execute_query(query_props, ())
-        
-        # Removed the review count as requested
-        stats = {
-            'total_users': (users_result['data'][0]['count'] or 0) if (users_result['success'] and users_result['data']) else 0,
-            'total_properties': (props_result['data'][0]['count'] or 0) if (props_result['success'] and props_result['data']) else 0
-        }
-        return jsonify({'success': True, 'data': stats})
+        result = db.execute_query(queries.ADMIN_STATS, ())
+        return jsonify(responses.counter_stats(result, ('total_users', 'total_properties')))
 
     except Exception as e:
         print(f"!!! ERROR in /api/admin/stats: {e}")
@@ -201,13 +230,7 @@ def admin_all_users():
     if session.get('role') != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'})
     try:
-        query = """
-            (SELECT owner_id AS id, name, email, phone, 'Owner' AS role FROM OWNER)
-            UNION ALL
-            (SELECT tenant_id AS id, name, email, phone, 'Tenant' AS role FROM TENANT)
-            ORDER BY name
-        """
-        result = db.execute_query(query, ())
+        result = db.execute_query(queries.ALL_USERS, ())
         return jsonify(result)
     except Exception as e:
         print(f"!!! ERROR in /api/admin/all_users: {e}")
@@ -220,19 +243,7 @@ def admin_all_apartments():
     if session.get('role') != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'})
     try:
-        query = """
-        SELECT 
-            p.property_id, p.address, p.city, p.description, p.sq_footage, 
-            p.monthly_rent, p.status,
-            o.name AS owner_name, o.email AS owner_email, o.phone AS owner_phone,
-            t.name AS tenant_name
-        FROM PROPERTY p
-        JOIN OWNER o ON p.owner_id = o.owner_id
-        LEFT JOIN OCCUPANCY occ ON p.property_id = occ.property_id AND occ.end_date IS NULL
-        LEFT JOIN TENANT t ON occ.tenant_id = t.tenant_id
-        ORDER BY p.property_id
-        """
-        result = db.execute_query(query, ())
+        result = report_queries.execute_query(queries.ALL_APARTMENTS, ())
         return jsonify(result)
     except Exception as e:
         print(f"!!! ERROR in /api/admin/all_apartments: {e}")
@@ -245,20 +256,7 @@ def admin_all_complaints():
     if session.get('role') != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'})
     try:
-        query = """
-        SELECT 
-            r.review_id, 
-            r.rating, 
-            r.comment, 
-            r.review_date,
-            t.name AS tenant_name,
-            p.address AS address
-        FROM REVIEW r
-        JOIN TENANT t ON r.tenant_id = t.tenant_id
-        JOIN PROPERTY p ON r.property_id = p.property_id
-        ORDER BY r.review_date DESC
-        """
-        result = db.execute_query(query, ())
+        result = db.execute_query(queries.ALL_COMPLAINTS, ())
         return jsonify(result)
     except Exception as e:
         print(f"!!! ERROR in /api/admin/all_complaints: {e}")
@@ -276,26 +274,86 @@ def admin_rating_report():
         return jsonify({'success': False, 'error': 'Unauthorized'})
     
     try:
-        # This query calls your function for every row
-        query = """
-        SELECT 
-            p.property_id, 
-            p.address, 
-            p.city, 
-            o.name AS owner_name,
-            fn_get_avg_rating(p.property_id) AS average_rating
-        FROM PROPERTY p
-        JOIN OWNER o ON p.owner_id = o.owner_id
-        ORDER BY average_rating DESC;
-        """
-        
-        result = db.execute_query(query, ())
+        result = report_queries.execute_query(queries.RATING_REPORT, ())
         return jsonify(result)
         
     except Exception as e:
         print(f"!!! ERROR in /api/admin/rating_report: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+
+@app.route('/api/admin/analytics')
+def admin_analytics():
+    """Platform-wide occupancy and yield metrics, e.g. /api/admin/analytics?months=12"""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    try:
+        months = request.args.get('months', 12, type=int)
+        return jsonify(portfolio_analytics.report(owner_id=None, months=months))
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/analytics: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/admin/query_coalescing', methods=['GET', 'DELETE'])
+def admin_query_coalescing():
+    """
+    GET reports how many report queries were shared instead of re-executed.
+    DELETE drops the stored results so the next calls go to the database.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    if request.method == 'DELETE':
+        report_queries.clear()
+    return jsonify({'success': True, 'data': report_queries.metrics()})
+
+
+@app.route('/api/admin/profiler', methods=['GET', 'POST', 'DELETE'])
+def admin_profiler():
+    """
+    GET returns the per-route breakdown collected so far.
+    POST {"routes": [...], "sample_rate": 0.1} enables sampling (a rate of 0 disables it).
+    DELETE switches profiling off and discards the samples.
+    Both apply to every worker; "scope" in the response says whether the
+    samples are from all workers or, without the PROFILER_* tables, this one.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    try:
+        if request.method == 'POST':
+            data = request.json or {}
+            routes = data.get('routes') or []
+            if isinstance(routes, str):
+                routes = [routes]
+            profiler.configure(routes, data.get('sample_rate', 0.1))
+        elif request.method == 'DELETE':
+            profiler.reset()
+
+        return jsonify({'success': True, 'data': profiler.summary()})
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/profiler: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/admin/profiler/flamegraph')
+def admin_profiler_flamegraph():
+    """Download sampled requests as folded stacks (flamegraph.pl / speedscope input)."""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    try:
+        return Response(
+            profiler.folded_stacks(),
+            mimetype='text/plain',
+            headers={'Content-Disposition': 'attachment; filename=profile.folded'}
+        )
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/profiler/flamegraph: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
 # ==================== OWNER ROUTES ====================
 
 @app.route('/owner')
@@ -313,21 +371,8 @@ def owner_properties():
         
     owner_id = session.get('user_id')
     
-    query = """
-    SELECT 
-        p.property_id, p.address, p.city, p.description, p.sq_footage,
-        p.monthly_rent, p.status,
-        t.tenant_id, t.name AS tenant_name, t.email AS tenant_email, t.phone AS tenant_phone,
-        occ.occupancy_id, occ.start_date, occ.end_date
-    FROM PROPERTY p
-    LEFT JOIN OCCUPANCY occ ON p.property_id = occ.property_id AND occ.end_date IS NULL
-    LEFT JOIN TENANT t ON occ.tenant_id = t.tenant_id
-    WHERE p.owner_id = %s
-    ORDER BY p.property_id
-    """
-    
     try:
-        result = db.execute_query(query, (owner_id,))
+        result = db.execute_query(queries.OWNER_PROPERTIES, (owner_id,))
         return jsonify(result)
     except Exception as e:
         print(f"!!! ERROR in /api/owner/properties: {e}")
@@ -343,23 +388,32 @@ def owner_stats():
     owner_id = session.get('user_id')
     
     try:
-        query_total = "SELECT COUNT(*) AS count FROM PROPERTY WHERE owner_id = %s"
-        total_result = db.execute_query(query_total, (owner_id,))
-        
-        query_rented = "SELECT COUNT(*) AS count FROM PROPERTY WHERE owner_id = %s AND status = 'Rented'"
-        rented_result = db.execute_query(query_rented, (owner_id,))
-        
-        stats = {
-            'total_properties': (total_result['data'][0]['count'] or 0) if (total_result['success'] and total_result['data']) else 0,
-            'rented_properties': (rented_result['data'][0]['count'] or 0) if (rented_result['success'] and rented_result['data']) else 0
-        }
-        return jsonify({'success': True, 'data': stats})
+        result = db.execute_query(queries.OWNER_STATS, (owner_id,))
+        return jsonify(responses.counter_stats(
+            result, ('total_properties', 'rented_properties', 'available_properties')
+        ))
         
     except Exception as e:
         print(f"!!! ERROR in /api/owner/stats: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/owner/analytics')
+def owner_analytics():
+    """Occupancy and yield metrics for the logged-in owner's portfolio."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    owner_id = session.get('user_id')
+
+    try:
+        months = request.args.get('months', 12, type=int)
+        return jsonify(portfolio_analytics.report(owner_id=owner_id, months=months))
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/analytics: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
 @app.route('/api/owner/property/<int:property_id>', methods=['GET'])
 def get_owner_property_details(property_id):
     """Get details for a single property, verifying ownership."""
@@ -369,8 +423,7 @@ def get_owner_property_details(property_id):
     owner_id = session.get('user_id')
     
     try:
-        query = "SELECT * FROM PROPERTY WHERE property_id = %s AND owner_id = %s"
-        result = db.execute_query(query, (property_id, owner_id))
+        result = db.execute_query(queries.OWNER_PROPERTY_DETAILS, (property_id, owner_id))
         
         if result['success'] and len(result['data']) > 0:
             return jsonify({'success': True, 'data': result['data'][0]})
@@ -393,10 +446,6 @@ def create_property():
     data = request.json
     owner_id = session.get('user_id')
     
-    query = """
-    INSERT INTO PROPERTY (owner_id, address, city, description, sq_footage, monthly_rent, status)
-    VALUES (%s, %s, %s, %s, %s, %s, 'Available')
-    """
     params = (
         owner_id,
         data.get('address'),
@@ -407,12 +456,8 @@ def create_property():
     )
     
     # fetch=False is correct for a simple INSERT
-    result = db.execute_query(query, params, fetch=False)
-    
-    if result['success']:
-        result['message'] = 'Property created successfully with status: Available'
-    
-    return jsonify(result)
+    result = db.execute_query(queries.CREATE_PROPERTY, params, fetch=False)
+    return jsonify(responses.with_message(result, 'Property created successfully with status: Available'))
 
 @app.route('/api/owner/property/<int:property_id>', methods=['PUT'])
 def update_property(property_id):
@@ -424,8 +469,7 @@ def update_property(property_id):
     owner_id = session.get('user_id')
     
     try:
-        check_query = "SELECT owner_id FROM PROPERTY WHERE property_id = %s"
-        check = db.execute_query(check_query, (property_id,))
+        check = db.execute_query(queries.PROPERTY_OWNER, (property_id,))
         
         if not check['success'] or len(check['data']) == 0:
             return jsonify({'success': False, 'error': 'Property not found'})
@@ -433,12 +477,6 @@ def update_property(property_id):
         if check['data'][0]['owner_id'] != owner_id:
             return jsonify({'success': False, 'error': 'Unauthorized'})
         
-        query = """
-        UPDATE PROPERTY 
-        SET address = %s, city = %s, description = %s, 
-            sq_footage = %s, monthly_rent = %s, status = %s
-        WHERE property_id = %s
-        """
         params = (
             data.get('address'),
             data.get('city'),
@@ -449,9 +487,10 @@ def update_property(property_id):
             property_id
         )
         
-        result = db.execute_query(query, params, fetch=False)
+        result = db.execute_query(queries.UPDATE_PROPERTY, params, fetch=False)
         
         if result['success']:
+            listing_cards.invalidate(property_id)
             result['message'] = 'Property updated successfully'
         
         return jsonify(result)
@@ -469,8 +508,7 @@ def delete_property(property_id):
     owner_id = session.get('user_id')
     
     try:
-        check_query = "SELECT owner_id FROM PROPERTY WHERE property_id = %s"
-        check = db.execute_query(check_query, (property_id,))
+        check = db.execute_query(queries.PROPERTY_OWNER, (property_id,))
         
         if not check['success'] or len(check['data']) == 0:
             return jsonify({'success': False, 'error': 'Property not found'})
@@ -481,22 +519,20 @@ def delete_property(property_id):
         # We must delete child records first
         
         # Find occupancy records to delete payments
-        occ_query = "SELECT occupancy_id FROM OCCUPANCY WHERE property_id = %s"
-        occ_result = db.execute_query(occ_query, (property_id,))
+        occ_result = db.execute_query(queries.PROPERTY_OCCUPANCY_IDS, (property_id,))
         
         if occ_result['success'] and occ_result['data']:
             occ_ids = [row['occupancy_id'] for row in occ_result['data']]
-            if occ_ids:
-                occ_id_list = ','.join(map(str, occ_ids))
-                pay_query = f"DELETE FROM PAYMENTS WHERE occupancy_id IN ({occ_id_list})"
-                db.execute_query(pay_query, (), fetch=False)
+            db.execute_query(queries.delete_payments(occ_ids), (), fetch=False)
 
         # Now delete reviews, occupancy, and finally the property
-        db.execute_query("DELETE FROM REVIEW WHERE property_id = %s", (property_id,), fetch=False)
-        db.execute_query("DELETE FROM OCCUPANCY WHERE property_id = %s", (property_id,), fetch=False)
-        result = db.execute_query("DELETE FROM PROPERTY WHERE property_id = %s", (property_id,), fetch=False)
+        db.execute_query(queries.DELETE_PROPERTY_REVIEWS, (property_id,), fetch=False)
+        db.execute_query(queries.DELETE_PROPERTY_OCCUPANCIES, (property_id,), fetch=False)
+        result = db.execute_query(queries.DELETE_PROPERTY, (property_id,), fetch=False)
         
+        availability.invalidate(property_id)
         if result['success']:
+            listing_cards.invalidate(property_id)
             result['message'] = 'Property and all related records deleted successfully'
         
         return jsonify(result)
@@ -513,8 +549,7 @@ def get_all_tenants():
         return jsonify({'success': False, 'error': 'Unauthorized'})
     
     try:
-        query = "SELECT tenant_id, name, email FROM TENANT ORDER BY name"
-        result = db.execute_query(query, ())
+        result = db.execute_query(queries.ALL_TENANTS, ())
         return jsonify(result)
     except Exception as e:
         print(f"!!! ERROR in /api/owner/all_tenants: {e}")
@@ -528,13 +563,14 @@ def assign_tenant():
         return jsonify({'success': False, 'error': 'Unauthorized'})
         
     data = request.json
-    property_id = data.get('property_id')
+    property_id = responses.id_field(data, 'property_id')
     tenant_id = data.get('tenant_id')
     owner_id = session.get('user_id')
+    if property_id is None:
+        return jsonify({'success': False, 'error': responses.PROPERTY_ID_ERROR})
 
     try:
-        check_query = "SELECT owner_id, status FROM PROPERTY WHERE property_id = %s"
-        check = db.execute_query(check_query, (property_id,))
+        check = db.execute_query(queries.PROPERTY_OWNER_STATUS, (property_id,))
         
         if not check['success'] or not check['data']:
             return jsonify({'success': False, 'error': 'Property not found'})
@@ -544,11 +580,7 @@ def assign_tenant():
              return jsonify({'success': False, 'error': 'Property is already rented'})
 
         # Check for same-day re-assignment
-        check_duplicate_query = """
-            SELECT occupancy_id FROM OCCUPANCY 
-            WHERE tenant_id = %s AND property_id = %s AND start_date = CURDATE()
-        """
-        duplicate_check = db.execute_query(check_duplicate_query, (tenant_id, property_id))
+        duplicate_check = db.execute_query(queries.SAME_DAY_ASSIGNMENT, (tenant_id, property_id))
         
         if duplicate_check['success'] and len(duplicate_check['data']) > 0:
             return jsonify({
@@ -556,17 +588,10 @@ def assign_tenant():
                 'error': 'This tenant was already assigned to this property today.'
             })
 
-        query = """
-            INSERT INTO OCCUPANCY (tenant_id, property_id, start_date)
-            VALUES (%s, %s, CURDATE())
-        """
         # This INSERT fires a trigger, so fetch=True is CRITICAL
-        result = db.execute_query(query, (tenant_id, property_id), fetch=True)
-        
-        if result['success']:
-            result['message'] = 'Tenant assigned successfully! Property is now Rented.'
-            
-        return jsonify(result)
+        result = db.execute_query(queries.ASSIGN_TENANT, (tenant_id, property_id), fetch=True)
+        availability.invalidate(property_id)
+        return jsonify(responses.with_message(result, 'Tenant assigned successfully! Property is now Rented.'))
 
     except Exception as e:
         print(f"!!! ERROR in /api/owner/assign_tenant: {e}")
@@ -584,28 +609,17 @@ def end_tenancy():
     owner_id = session.get('user_id')
 
     try:
-        check_query = """
-            SELECT p.owner_id 
-            FROM OCCUPANCY o
-            JOIN PROPERTY p ON o.property_id = p.property_id
-            WHERE o.occupancy_id = %s
-        """
-        check = db.execute_query(check_query, (occupancy_id,))
+        check = db.execute_query(queries.OCCUPANCY_OWNER, (occupancy_id,))
         
         if not check['success'] or not check['data']:
              return jsonify({'success': False, 'error': 'Occupancy record not found.'})
         if check['data'][0]['owner_id'] != owner_id:
             return jsonify({'success': False, 'error': 'Unauthorized'})
 
-        query = "CALL sp_checkout_tenant(%s, CURDATE())"
-        
         # CALLing a procedure requires fetch=True to clear the connection
-        result = db.execute_query(query, (occupancy_id,), fetch=True)
-        
-        if result['success']:
-            result['message'] = 'Tenancy ended. Property is now Available.'
-            
-        return jsonify(result)
+        result = db.execute_query(queries.CHECKOUT_TENANT, (occupancy_id,), fetch=True)
+        availability.invalidate(check['data'][0]['property_id'])
+        return jsonify(responses.with_message(result, 'Tenancy ended. Property is now Available.'))
 
     except Exception as e:
         print(f"!!! ERROR in /api/owner/end_tenancy: {e}")
@@ -625,27 +639,7 @@ def get_owner_payments():
     selected_month = request.args.get('month', datetime.now().strftime('%Y-%m'))
     
     try:
-        query = """
-        SELECT 
-            pay.payment_id,
-            pay.amount,
-            pay.payment_date,
-            pay.month_year,
-            pay.method,
-            pay.status,
-            t.name AS tenant_name,
-            p.address AS property_address
-        FROM PAYMENTS pay
-        JOIN OCCUPANCY occ ON pay.occupancy_id = occ.occupancy_id
-        JOIN PROPERTY p ON occ.property_id = p.property_id
-        JOIN TENANT t ON occ.tenant_id = t.tenant_id
-        WHERE 
-            p.owner_id = %s 
-            AND pay.month_year = %s
-        ORDER BY pay.payment_date DESC
-        """
-        
-        result = db.execute_query(query, (owner_id, selected_month))
+        result = db.execute_query(queries.OWNER_PAYMENTS, (owner_id, selected_month))
         return jsonify(result)
         
     except Exception as e:
@@ -674,55 +668,13 @@ def tenant_rentals():
     
     try:
         # First, get all rental (occupancy) details
-        query = """
-        SELECT 
-            p.property_id, p.address, p.city, p.description, p.sq_footage,
-            p.monthly_rent, p.status,
-            o.name AS owner_name, o.phone AS owner_phone,
-            occ.occupancy_id, occ.start_date, occ.end_date
-        FROM OCCUPANCY occ
-        JOIN PROPERTY p ON occ.property_id = p.property_id
-        JOIN OWNER o ON p.owner_id = o.owner_id
-        WHERE occ.tenant_id = %s
-        ORDER BY occ.start_date DESC
-        """
-        rental_result = db.execute_query(query, (tenant_id,))
+        rental_result = db.execute_query(queries.TENANT_RENTALS, (tenant_id,))
         if not rental_result['success']:
             return jsonify(rental_result)
 
         # Now, get ALL payments for this tenant in ONE query
-        payment_query = """
-            SELECT p.payment_id, p.amount, p.payment_date, p.month_year, p.method, p.status, p.occupancy_id
-            FROM PAYMENTS p
-            JOIN OCCUPANCY o ON p.occupancy_id = o.occupancy_id
-            WHERE o.tenant_id = %s
-        """
-        payment_result = db.execute_query(payment_query, (tenant_id,))
-        
-        payments_map = {}
-        if payment_result['success'] and payment_result['data']:
-            for payment in payment_result['data']:
-                occ_id = payment['occupancy_id']
-                if occ_id not in payments_map:
-                    payments_map[occ_id] = []
-                payments_map[occ_id].append(payment)
-
-        # Now, combine the data in Python (fast, no nested queries)
-        current_month = datetime.now().strftime('%Y-%m')
-        for rental in rental_result['data']:
-            # Assign payments
-            rental['payments'] = payments_map.get(rental['occupancy_id'], [])
-            
-            # Calculate rent_due
-            rental['rent_due'] = True
-            if rental['end_date'] is not None: # If tenancy is over, rent is not due
-                rental['rent_due'] = False
-            else:
-                for payment in rental['payments']:
-                    if payment['month_year'] == current_month and payment['status'] in ['Paid', 'Pending']:
-                        rental['rent_due'] = False
-                        break
-        
+        payment_result = db.execute_query(queries.TENANT_RENTAL_PAYMENTS, (tenant_id,))
+        responses.attach_payments(rental_result['data'], payment_result)
         return jsonify(rental_result)
 
     except Exception as e:
@@ -730,6 +682,57 @@ def tenant_rentals():
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/tenant/ledger')
+def tenant_ledger():
+    """
+    One summary row per occupancy with rent due, balance, last payment and
+    late count computed in the database. Payment history is served separately
+    by /api/tenant/payments, so this payload does not grow with tenure.
+    """
+    if session.get('role') != 'tenant':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    tenant_id = session.get('user_id')
+    current_month = datetime.now().strftime('%Y-%m')
+
+    try:
+        result = db.execute_query(queries.TENANT_LEDGER, (current_month, tenant_id, tenant_id))
+        return jsonify(responses.ledger_rows(result))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/tenant/ledger: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/tenant/payments')
+def tenant_payments():
+    """
+    Paginated, date-bounded payment history.
+    Query args: occupancy_id (optional), from / to (YYYY-MM-DD, default: the last 12 months),
+    page (default 1), per_page (default 20, max 100).
+    """
+    if session.get('role') != 'tenant':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    tenant_id = session.get('user_id')
+
+    try:
+        date_from, date_to = responses.payment_window(request.args)
+    except (ValueError, OverflowError):
+        return jsonify({'success': False, 'error': responses.PAYMENT_DATES_ERROR})
+
+    page, per_page, occupancy_id = responses.paging(request.args)
+    query, params = queries.tenant_payments(tenant_id, date_from, date_to, occupancy_id, page, per_page)
+
+    try:
+        result = db.execute_query(query, params)
+        return jsonify(responses.payments_page(result, page, per_page, date_from, date_to))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/tenant/payments: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
 @app.route('/api/tenant/make_payment', methods=['POST'])
 def make_payment():
     """Simulates making a payment for a specific occupancy."""
@@ -741,18 +744,13 @@ def make_payment():
     tenant_id = session.get('user_id')
 
     try:
-        check_query = "SELECT tenant_id FROM OCCUPANCY WHERE occupancy_id = %s"
-        check = db.execute_query(check_query, (occupancy_id,))
+        check = db.execute_query(queries.OCCUPANCY_TENANT, (occupancy_id,))
         
         if not check['success'] or not check['data']:
             return jsonify({'success': False, 'error': 'Occupancy record not found.'})
         if check['data'][0]['tenant_id'] != tenant_id:
             return jsonify({'success': False, 'error': 'Unauthorized action.'})
 
-        query = """
-            INSERT INTO PAYMENTS (occupancy_id, amount, payment_date, month_year, method, status)
-            VALUES (%s, %s, CURDATE(), %s, %s, 'Paid')
-        """
         params = (
             occupancy_id,
             data.get('amount'),
@@ -760,12 +758,8 @@ def make_payment():
             data.get('method')
         )
         
-        result = db.execute_query(query, params, fetch=False)
-        
-        if result['success']:
-            result['message'] = 'Payment successful!'
-        
-        return jsonify(result)
+        result = db.execute_query(queries.MAKE_PAYMENT, params, fetch=False)
+        return jsonify(responses.with_message(result, 'Payment successful!'))
 
     except Exception as e:
         print(f"!!! ERROR in /api/tenant/make_payment: {e}")
@@ -780,33 +774,26 @@ def submit_review():
     
     data = request.json
     tenant_id = session.get('user_id')
+    property_id = responses.id_field(data, 'property_id')
+    if property_id is None:
+        return jsonify({'success': False, 'error': responses.PROPERTY_ID_ERROR})
     
-    query = """
-    INSERT INTO REVIEW (tenant_id, property_id, rating, comment, review_date)
-    VALUES (%s, %s, %s, %s, CURDATE())
-    """
     params = (
         tenant_id,
-        data.get('property_id'),
+        property_id,
         data.get('rating'),
         data.get('comment')
     )
     
     # We use fetch=False, just like your working signup() function.
     # This will allow your database.py to handle the commit correctly.
-    result = db.execute_query(query, params, fetch=False)
+    result = db.execute_query(queries.SUBMIT_REVIEW, params, fetch=False)
     
     if result['success']:
-        result['message'] = 'Review submitted successfully'
-    else:
-        # Check if the trigger fired (which is an error we expect)
-        if result.get('error') and 'trg_prevent_duplicate_review' in result.get('error', ''):
-            result['message'] = 'You have already reviewed this property'
-            result['error'] = 'You have already reviewed this property' # Make error clear
-        elif result.get('error'):
-             result['error'] = 'You have already reviewed this property' # General error
+        # The card shows the average rating
+        listing_cards.invalidate(property_id)
         
-    return jsonify(result)
+    return jsonify(responses.review_result(result))
 
 
 @app.route('/api/tenant/request-rent', methods=['POST'])
@@ -817,11 +804,12 @@ def request_rent():
     
     data = request.json
     tenant_id = session.get('user_id')
-    property_id = data.get('property_id')
+    property_id = responses.id_field(data, 'property_id')
+    if property_id is None:
+        return jsonify({'success': False, 'error': responses.PROPERTY_ID_ERROR})
     
     try:
-        check_query = "SELECT status FROM PROPERTY WHERE property_id = %s"
-        check = db.execute_query(check_query, (property_id,))
+        check = db.execute_query(queries.PROPERTY_STATUS, (property_id,))
         
         if not check['success'] or len(check['data']) == 0:
             return jsonify({'success': False, 'error': 'Property not found'})
@@ -829,18 +817,10 @@ def request_rent():
         if check['data'][0]['status'] != 'Available':
             return jsonify({'success': False, 'error': 'Property is not available'})
         
-        query = """
-        INSERT INTO OCCUPANCY (tenant_id, property_id, start_date, end_date)
-        VALUES (%s, %s, CURDATE(), NULL)
-        """
-        
         # This INSERT fires a trigger, so fetch=True is CRITICAL
-        result = db.execute_query(query, (tenant_id, property_id), fetch=True)
-        
-        if result['success']:
-            result['message'] = 'Rental request successful! Property status updated to Rented.'
-        
-        return jsonify(result)
+        result = db.execute_query(queries.REQUEST_RENT, (tenant_id, property_id), fetch=True)
+        availability.invalidate(property_id)
+        return jsonify(responses.with_message(result, 'Rental request successful! Property status updated to Rented.'))
         
     except Exception as e:
         print(f"!!! ERROR in /api/tenant/request-rent: {e}")
@@ -851,33 +831,78 @@ def request_rent():
 @app.route('/api/properties/browse')
 def browse_properties():
     """Browse all available properties, NO NESTED QUERIES."""
-    
-    # This query now joins a subquery to get the avg_rating
-    # This is efficient and avoids nested loops.
-    query = """
-    SELECT 
-        p.property_id, p.address, p.city, p.description, p.sq_footage,
-        p.monthly_rent, p.status,
-        o.name AS owner_name,
-        o.phone AS owner_phone,
-        COALESCE(r.avg_rating, 0) AS avg_rating
-    FROM PROPERTY p
-    JOIN OWNER o ON p.owner_id = o.owner_id
-    LEFT JOIN (
-        SELECT property_id, AVG(rating) as avg_rating
-        FROM REVIEW
-        GROUP BY property_id
-    ) r ON p.property_id = r.property_id
-    WHERE p.status = 'Available'
-    ORDER BY p.city, p.monthly_rent
-    """
     try:
-        result = db.execute_query(query, ())
+        if listing_snapshot.ready:
+            return jsonify({'success': True, 'data': listing_snapshot.browse_rows(), 'messages': []})
+        result = report_queries.execute_query(queries.BROWSE_PROPERTIES, ())
         return jsonify(result)
     except Exception as e:
         print(f"!!! ERROR in /api/properties/browse: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+
+@app.route('/api/properties/available')
+def available_properties():
+    """
+    Properties with no tenancy overlapping a date range, e.g.
+    /api/properties/available?from=2025-12-01&to=2026-05-31 (to defaults to from).
+    """
+    try:
+        first_day, last_day = responses.date_range(request.args, 0)
+    except (ValueError, OverflowError):
+        return jsonify({'success': False, 'error': responses.DATE_RANGE_ERROR})
+
+    try:
+        result = report_queries.execute_query(queries.RENTABLE_PROPERTIES, ())
+        if not result['success']:
+            return jsonify(result)
+
+        free_ids = availability.available(
+            [row['property_id'] for row in result['data']], first_day, last_day
+        )
+        return jsonify(responses.available_listing(result['data'], free_ids, first_day, last_day))
+    except Exception as e:
+        print(f"!!! ERROR in /api/properties/available: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/properties/<int:property_id>/calendar')
+def property_calendar(property_id):
+    """
+    Occupied and free date ranges of one property between from (default today)
+    and to (default 180 days later), e.g. /api/properties/303/calendar?from=2025-12-01
+    """
+    try:
+        first_day, last_day = responses.date_range(request.args, 180)
+    except (ValueError, OverflowError):
+        return jsonify({'success': False, 'error': responses.DATE_RANGE_ERROR})
+
+    try:
+        check = db.execute_query(queries.PROPERTY_STATUS, (property_id,))
+        if not check['success']:
+            return jsonify(check)
+        if not check['data']:
+            return jsonify({'success': False, 'error': 'Property not found'})
+
+        calendar = availability.calendar(property_id, first_day, last_day)
+        return jsonify(responses.property_calendar(
+            property_id, check['data'][0]['status'], calendar, first_day, last_day
+        ))
+    except Exception as e:
+        print(f"!!! ERROR in /api/properties/<id>/calendar: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== MAINTENANCE COMMANDS ====================
+
+@app.cli.command('rebuild-counters')
+def rebuild_counters():
+    """Recompute the dashboard counter tables from scratch (flask --app app rebuild-counters)."""
+    result = db.call_procedure('sp_rebuild_counters')
+    if result['success']:
+        print("Dashboard counters rebuilt.")
+    else:
+        print(f"!!! ERROR rebuilding counters: {result.get('error')}")
+
 # ==================== MAIN RUN ====================
 
 if __name__ == '__main__':
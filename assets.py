@@ -0,0 +1,376 @@
+"""
+Static asset pipeline.
+
+`python assets.py` minifies static/css and static/js, content-hashes every
+asset into static/dist, writes gzip (and brotli, when the `brotli` package
+is installed) variants and a manifest.json that maps source names to the
+hashed files. Templates reference assets through asset_url(), which falls
+back to the plain /static URL when no build has been run.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+ASSET_URL_PREFIX = '/assets'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+COMPRESSIBLE = ('.css', '.js')
+# Preferred first; the value is the suffix of the precompressed file
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+# ==================== MINIFIERS ====================
+
+# Comments and quoted strings; a lone quote is an unterminated string running to the end
+CSS_LITERALS = re.compile(r'''/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|["']''', re.S)
+
+
+def _minify_css_code(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}')
+
+
+def minify_css(text):
+    """Strip comments and collapse whitespace in a stylesheet; quoted strings are copied untouched"""
+    pieces = []
+    code = []
+    pos = 0
+    for match in CSS_LITERALS.finditer(text):
+        code.append(text[pos:match.start()])
+        pos = match.end()
+        if match.group(0).startswith('/*'):
+            continue
+        pieces.append(_minify_css_code(''.join(code)))
+        pieces.append(match.group(0))
+        code = []
+    code.append(text[pos:])
+    pieces.append(_minify_css_code(''.join(code)))
+    return ''.join(pieces).strip()
+
+
+# A `/` after one of these (or after a keyword below) starts a regex literal, not a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+                  'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+
+
+def _regex_allowed(out):
+    j = len(out) - 1
+    while j >= 0 and out[j] in ' \n':
+        j -= 1
+    if j < 0 or out[j] in REGEX_PRECEDERS:
+        return True
+    k = j
+    while k >= 0 and (out[k].isalnum() or out[k] in '_$'):
+        k -= 1
+    return ''.join(out[k + 1:j + 1]) in REGEX_KEYWORDS
+
+
+def _literal_end(text, i, quote):
+    """Index just past the string / regex literal starting at i"""
+    n = len(text)
+    j = i + 1
+    in_class = False
+    while j < n:
+        char = text[j]
+        if char == '\\':
+            j += 2
+            continue
+        if quote == '/' and char == '[':
+            in_class = True
+        elif quote == '/' and char == ']':
+            in_class = False
+        elif char == quote and not in_class:
+            return j + 1
+        elif char == '\n':
+            return j
+        j += 1
+    return n
+
+
+def minify_js(text):
+    """
+    Conservative JS minifier: drops comments, indentation and blank lines.
+    Strings, regex and template literals (including their ${...} parts) are
+    copied untouched, and line breaks are kept, so automatic semicolon
+    insertion and literal contents behave exactly as in the source.
+    """
+    out = []
+    expressions = []     # brace depth of every enclosing template ${ } expression
+    in_template = False
+    i, n = 0, len(text)
+
+    def end_line():
+        while out and out[-1] == ' ':
+            out.pop()
+        if out and out[-1] != '\n':
+            out.append('\n')
+
+    while i < n:
+        char = text[i]
+        if in_template:
+            if char == '\\':
+                out.extend(text[i:i + 2])
+                i += 2
+                continue
+            if char == '`':
+                in_template = False
+            elif text.startswith('${', i):
+                expressions.append(0)
+                in_template = False
+                out.extend('${')
+                i += 2
+                continue
+            out.append(char)
+            i += 1
+            continue
+
+        if char in ' \t\r\f\v':
+            # Indentation and runs of spaces between tokens
+            if out and out[-1] not in ' \n':
+                out.append(' ')
+            i += 1
+        elif char == '\n':
+            end_line()
+            i += 1
+        elif text.startswith('//', i):
+            newline = text.find('\n', i)
+            i = n if newline == -1 else newline
+        elif text.startswith('/*', i):
+            close = text.find('*/', i + 2)
+            close = n if close == -1 else close + 2
+            # A comment spanning lines still separates statements
+            if '\n' in text[i:close]:
+                end_line()
+            elif out and out[-1] not in ' \n':
+                out.append(' ')
+            i = close
+        elif char in '\'"' or (char == '/' and _regex_allowed(out)):
+            end = _literal_end(text, i, char)
+            out.extend(text[i:end])
+            i = end
+        elif char == '`':
+            in_template = True
+            out.append(char)
+            i += 1
+        else:
+            if expressions and char == '{':
+                expressions[-1] += 1
+            elif expressions and char == '}':
+                if expressions[-1] == 0:
+                    # End of a ${ } expression: back inside the template literal
+                    expressions.pop()
+                    in_template = True
+                else:
+                    expressions[-1] -= 1
+            out.append(char)
+            i += 1
+
+    end_line()
+    return ''.join(out)
+
+
+# ==================== BUILD ====================
+
+def _hashed_name(name, content):
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    root, ext = posixpath.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+def _source_files(subdir, extensions):
+    folder = os.path.join(STATIC_DIR, subdir)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        f"{subdir}/{filename}" for filename in os.listdir(folder)
+        if filename.endswith(extensions)
+    )
+
+
+def _rewrite_css_urls(name, css, manifest):
+    """Point relative url(...) references at the hashed files"""
+    base = posixpath.dirname(name)
+
+    def replace(match):
+        target = match.group(2)
+        if re.match(r'^(https?:|data:|/)', target):
+            return match.group(0)
+        resolved = posixpath.normpath(posixpath.join(base, target))
+        if resolved not in manifest:
+            return match.group(0)
+        hashed = posixpath.relpath(manifest[resolved], base)
+        return f"url({match.group(1)}{hashed}{match.group(1)})"
+
+    return re.sub(r'''url\((['"]?)([^'")]+)\1\)''', replace, css)
+
+
+def _write(name, content):
+    path = os.path.join(DIST_DIR, *name.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    if name.endswith(COMPRESSIBLE):
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(content))
+
+
+def build():
+    """Rebuild static/dist and its manifest from the source assets"""
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    manifest = {}
+
+    # Images first so stylesheets can reference their hashed names
+    for name in _source_files('images', ('.webp', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico')):
+        with open(os.path.join(STATIC_DIR, name), 'rb') as f:
+            content = f.read()
+        manifest[name] = _hashed_name(name, content)
+        _write(manifest[name], content)
+
+    for name in _source_files('css', ('.css',)):
+        with open(os.path.join(STATIC_DIR, name), encoding='utf-8') as f:
+            css = _rewrite_css_urls(name, minify_css(f.read()), manifest)
+        content = css.encode('utf-8')
+        manifest[name] = _hashed_name(name, content)
+        _write(manifest[name], content)
+
+    for name in _source_files('js', ('.js',)):
+        with open(os.path.join(STATIC_DIR, name), encoding='utf-8') as f:
+            content = minify_js(f.read()).encode('utf-8')
+        manifest[name] = _hashed_name(name, content)
+        _write(manifest[name], content)
+
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# ==================== SERVING ====================
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def parse_accept_encoding(header):
+    """{coding: q-value} from an Accept-Encoding header (q=0 means not acceptable)"""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def resolve_asset(filename, accept_encoding):
+    """
+    Pick the file to send for a hashed asset.
+    Returns (relative path inside DIST_DIR, mimetype, content encoding or None),
+    or None when the asset does not exist.
+    """
+    path = os.path.join(DIST_DIR, *filename.split('/'))
+    if '..' in filename.split('/') or not os.path.isfile(path):
+        return None
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    accepted = parse_accept_encoding(accept_encoding)
+    candidates = [
+        (accepted.get(encoding, accepted.get('*', 0.0)), encoding, suffix)
+        for encoding, suffix in ENCODINGS
+    ]
+    # Highest q-value wins; ties keep our preference order (sort is stable)
+    candidates.sort(key=lambda candidate: -candidate[0])
+    for quality, encoding, suffix in candidates:
+        if quality > 0 and os.path.isfile(path + suffix):
+            return filename + suffix, mimetype, encoding
+    return filename, mimetype, None
+
+
+def asset_url_function(manifest, url_for):
+    """asset_url(filename) for templates: the hashed URL, or the plain /static one without a build"""
+    def asset_url(filename):
+        hashed = manifest.get(filename)
+        if hashed:
+            return f"{ASSET_URL_PREFIX}/{hashed}"
+        return url_for('static', filename=filename)
+    return asset_url
+
+
+def _immutable(response, encoding):
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    """Register asset_url() for templates and the immutable /assets route on a Flask or Quart app"""
+    is_async = type(app).__module__.split('.')[0] == 'quart'
+    if is_async:
+        from quart import abort, request, send_from_directory, url_for
+    else:
+        from flask import abort, request, send_from_directory, url_for
+
+    asset_url = asset_url_function(load_manifest(), url_for)
+
+    @app.context_processor
+    def asset_helpers():
+        return {'asset_url': asset_url}
+
+    def resolve(filename):
+        resolved = resolve_asset(filename, request.headers.get('Accept-Encoding', ''))
+        if resolved is None:
+            abort(404)
+        return resolved
+
+    if is_async:
+        async def hashed_asset(filename):
+            """Serve fingerprinted assets with far-future caching"""
+            send_name, mimetype, encoding = resolve(filename)
+            response = await send_from_directory(DIST_DIR, send_name, mimetype=mimetype, cache_timeout=31536000)
+            return _immutable(response, encoding)
+    else:
+        def hashed_asset(filename):
+            """Serve fingerprinted assets with far-future caching"""
+            send_name, mimetype, encoding = resolve(filename)
+            response = send_from_directory(DIST_DIR, send_name, mimetype=mimetype, max_age=31536000)
+            return _immutable(response, encoding)
+
+    app.add_url_rule(f'{ASSET_URL_PREFIX}/<path:filename>', 'hashed_asset', hashed_asset)
+
+
+if __name__ == '__main__':
+    built = build()
+    print(f"Built {len(built)} assets into {DIST_DIR}")
@@ -0,0 +1,878 @@
+"""
+Async serving mode.
+
+Same routes, templates and JSON as app.py, served by Quart on asyncio with an
+aiomysql connection pool, so a request waiting on MySQL holds no thread.
+Both apps run the SQL in queries.py and shape responses with responses.py;
+only the awaiting differs. The request profiler hooks Flask signals and is
+available in app.py only.
+Run with:
+    hypercorn async_app:app --bind 0.0.0.0:5000
+"""
+from quart import Quart, render_template, stream_template, request, jsonify, session, redirect, url_for
+from async_database import AsyncDatabase
+from database import Database
+import assets
+from analytics import PortfolioAnalytics
+from fragment_cache import FragmentCache
+from cache_sync import ChangeFeed, property_ids
+from singleflight import AsyncSingleFlight
+from listing_snapshot import ListingSnapshot
+from availability import AvailabilityIndex
+import queries
+import responses
+from datetime import datetime
+import asyncio
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+app = Quart(__name__)
+app.secret_key = os.getenv('FLASK_SECRET_KEY', 'fallback_secret_key')
+
+# Fingerprinted static assets, registered exactly as in app.py (see assets.py)
+assets.init_app(app)
+
+db = AsyncDatabase()
+
+# Analytics is CPU-bound NumPy work on a blocking connection; it runs in a
+# worker thread, one report at a time.
+analytics_db = Database(autocommit=True)
+portfolio_analytics = PortfolioAnalytics(analytics_db)
+analytics_lock = asyncio.Lock()
+
+# Rendered home.html listing cards, keyed by (property_id, row version)
+listing_cards = FragmentCache('_property_card.html')
+
+# Persisted listing data shared by all workers (see listing_snapshot.py); its
+# catch-up queries block on their own connection, so reads run in a thread
+snapshot_db = Database(autocommit=True)
+listing_snapshot = ListingSnapshot(snapshot_db)
+
+# Searches are streamed: the page shell is sent at once, cards follow as rows arrive
+STREAM_SEARCH_RESULTS = os.getenv('STREAM_SEARCH_RESULTS', 'True') == 'True'
+SEARCH_STREAM_CHUNK = int(os.getenv('SEARCH_STREAM_CHUNK', '100'))
+
+# Expensive full-table reads: identical concurrent queries share one execution
+report_queries = AsyncSingleFlight(db)
+
+# Occupancy interval index; its lookups block on their own connection, so they run in a thread
+availability_db = Database(autocommit=True)
+availability = AvailabilityIndex(availability_db)
+
+# Cross-process invalidation: the outbox poller runs in its own thread
+change_feed = ChangeFeed(Database(autocommit=True))
+
+def _invalidate_listing_cards(events):
+    listing_cards.invalidate(*property_ids(events))
+
+change_feed.subscribe(['PROPERTY', 'OCCUPANCY', 'REVIEW'], _invalidate_listing_cards)
+change_feed.subscribe(['OWNER'], lambda events: listing_cards.clear())
+change_feed.subscribe(['PROPERTY', 'OWNER', 'REVIEW'], lambda events: listing_snapshot.mark_stale())
+change_feed.subscribe(['PROPERTY', 'OCCUPANCY', 'PAYMENTS'], lambda events: portfolio_analytics.clear())
+change_feed.subscribe(['PROPERTY', 'OWNER', 'TENANT', 'OCCUPANCY', 'REVIEW'], lambda events: report_queries.clear())
+change_feed.subscribe(['OCCUPANCY'], lambda events: availability.invalidate(*property_ids(events)))
+
+
+@app.before_serving
+async def startup():
+    await db.connect()
+    await asyncio.to_thread(analytics_db.connect)
+    await asyncio.to_thread(availability_db.connect)
+    await asyncio.to_thread(snapshot_db.connect)
+    await asyncio.to_thread(listing_snapshot.load)
+    await asyncio.to_thread(change_feed.start)
+
+
+@app.after_request
+async def apply_local_writes(response):
+    """Apply this worker's own writes to its caches now rather than on the next poll"""
+    if request.method in ('POST', 'PUT', 'DELETE') and request.path.startswith('/api/'):
+        await asyncio.to_thread(change_feed.poll)
+    return response
+
+
+@app.after_serving
+async def shutdown():
+    await db.disconnect()
+    analytics_db.disconnect()
+    availability_db.disconnect()
+    snapshot_db.disconnect()
+
+
+# ==================== PUBLIC HOME & AUTH ROUTES ====================
+
+async def stream_listing_cards(query, params):
+    """Rendered cards for a listing query, one DB chunk in memory at a time"""
+    async for rows in db.stream_query(query, params, SEARCH_STREAM_CHUNK):
+        for card in await listing_cards.render_all_async(app.jinja_env, rows, 'property_id'):
+            yield card
+
+
+@app.route('/', methods=['GET', 'POST'])
+async def home():
+    """Public-facing homepage with property search."""
+
+    form = await request.form if request.method == 'POST' else None
+    query, params = queries.home_search(form)
+
+    try:
+        if request.method == 'GET' and listing_snapshot.ready:
+            # Default listing comes from the snapshot, no join per request
+            properties = await asyncio.to_thread(listing_snapshot.home_rows)
+        elif STREAM_SEARCH_RESULTS:
+            # The query only starts once the shell up to the results list has been sent
+            return await stream_template('home.html', cards=stream_listing_cards(query, params))
+        else:
+            result = await db.execute_query(query, params)
+            properties = result['data'] if result['success'] else []
+        # Only new or changed listings are rendered, the rest come from the cache
+        cards = await listing_cards.render_all_async(app.jinja_env, properties, 'property_id')
+        return await render_template('home.html', cards=cards)
+
+    except Exception as e:
+        print(f"!!! ERROR in /: {e}")
+        return await render_template('home.html', cards=[])
+
+
+@app.route('/login')
+async def index():
+    """Role selection page"""
+    session.clear()
+    return await render_template('index.html')
+
+@app.route('/login-form/<role>')
+async def login_page(role):
+    """Login page for different roles"""
+    if role not in ['admin', 'owner', 'tenant']:
+        return redirect(url_for('index'))
+    return await render_template('login.html', role=role)
+
+@app.route('/api/login', methods=['POST'])
+async def login():
+    """Handle login for all roles"""
+    data = await request.get_json()
+    role = data.get('role')
+
+    if role == 'admin':
+        if data.get('username') == 'admin' and data.get('password') == 'admin':
+            session['role'] = 'admin'
+            session['user_id'] = 0
+            session['user_name'] = 'Administrator'
+            return jsonify({'success': True, 'redirect': '/admin'})
+        else:
+            return jsonify({'success': False, 'error': 'Invalid admin credentials'})
+
+    elif role in ['owner', 'tenant']:
+        name = data.get('name', '').strip()
+        email = data.get('email', '').strip()
+
+        if not name or not email:
+            return jsonify({'success': False, 'error': 'Name and Email are required'})
+
+        query, id_field = queries.login_lookup(role)
+        result = await db.execute_query(query, (name, email))
+
+        if result['success'] and len(result['data']) > 0:
+            user = result['data'][0]
+            session['role'] = role
+            session['user_id'] = user[id_field]
+            session['user_name'] = user['name']
+            session['user_email'] = user['email']
+            return jsonify({'success': True, 'redirect': f'/{role}'})
+        else:
+            return jsonify({'success': False, 'error': 'Invalid credentials'})
+
+    return jsonify({'success': False, 'error': 'Invalid role'})
+
+@app.route('/signup')
+async def signup_page():
+    """Signup page"""
+    return await render_template('signup.html')
+
+@app.route('/api/signup', methods=['POST'])
+async def signup():
+    """Handle signup for owner/tenant"""
+    data = await request.get_json()
+    role = data.get('role')
+    name = data.get('name')
+    email = data.get('email')
+    phone = data.get('phone')
+
+    if role == 'owner':
+        bank_details = data.get('bank_details', '')
+        result = await db.execute_query(queries.SIGNUP_OWNER, (name, email, phone, bank_details), fetch=False)
+    elif role == 'tenant':
+        id_proof = data.get('id_proof', '')
+        result = await db.execute_query(queries.SIGNUP_TENANT, (name, email, phone, id_proof), fetch=False)
+    else:
+        return jsonify({'success': False, 'error': 'Invalid role'})
+
+    if result['success']:
+        return jsonify({'success': True, 'message': 'Account created successfully'})
+    else:
+        return jsonify({'success': False, 'error': result.get('error', 'Signup failed')})
+
+@app.route('/logout')
+async def logout():
+    """Logout and return to role selection"""
+    session.clear()
+    return redirect(url_for('index'))
+
+# ==================== ADMIN ROUTES ====================
+
+@app.route('/admin')
+async def admin_dashboard():
+    """Admin dashboard"""
+    if session.get('role') != 'admin':
+        return redirect(url_for('index'))
+    return await render_template('admin_dashboard.html')
+
+
+@app.route('/api/admin/stats')
+async def admin_stats():
+    """Get dashboard card statistics."""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+    try:
+        result = await db.execute_query(queries.ADMIN_STATS, ())
+        return jsonify(responses.counter_stats(result, ('total_users', 'total_properties')))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/stats: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/admin/all_users')
+async def admin_all_users():
+    """Get all owners and tenants."""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+    try:
+        result = await db.execute_query(queries.ALL_USERS, ())
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/all_users: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/admin/all_apartments')
+async def admin_all_apartments():
+    """Get all properties with details."""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+    try:
+        result = await report_queries.execute_query(queries.ALL_APARTMENTS, ())
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/all_apartments: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/admin/all_complaints')
+async def admin_all_complaints():
+    """Get all reviews (complaints)."""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+    try:
+        result = await db.execute_query(queries.ALL_COMPLAINTS, ())
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/all_complaints: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/admin/rating_report')
+async def admin_rating_report():
+    """Average rating of every property via the fn_get_avg_rating() SQL function."""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    try:
+        result = await report_queries.execute_query(queries.RATING_REPORT, ())
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/rating_report: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/admin/analytics')
+async def admin_analytics():
+    """Platform-wide occupancy and yield metrics, e.g. /api/admin/analytics?months=12"""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    try:
+        months = request.args.get('months', 12, type=int)
+        async with analytics_lock:
+            result = await asyncio.to_thread(portfolio_analytics.report, None, months)
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/admin/analytics: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/admin/query_coalescing', methods=['GET', 'DELETE'])
+async def admin_query_coalescing():
+    """
+    GET reports how many report queries were shared instead of re-executed.
+    DELETE drops the stored results so the next calls go to the database.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    if request.method == 'DELETE':
+        report_queries.clear()
+    return jsonify({'success': True, 'data': report_queries.metrics()})
+
+
+@app.route('/api/admin/profiler', methods=['GET', 'POST', 'DELETE'])
+@app.route('/api/admin/profiler/flamegraph')
+async def admin_profiler():
+    """The sampling profiler hooks into Flask; it is not available in async mode."""
+    if session.get('role') != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+    return jsonify({'success': False, 'error': 'Profiling is only available when running app.py'})
+
+# ==================== OWNER ROUTES ====================
+
+@app.route('/owner')
+async def owner_dashboard():
+    """Owner dashboard"""
+    if session.get('role') != 'owner':
+        return redirect(url_for('index'))
+    return await render_template('owner_dashboard.html')
+
+@app.route('/api/owner/properties')
+async def owner_properties():
+    """Get owner's properties. NO NESTED QUERIES."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    owner_id = session.get('user_id')
+
+    try:
+        result = await db.execute_query(queries.OWNER_PROPERTIES, (owner_id,))
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/properties: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/owner/stats')
+async def owner_stats():
+    """Get dashboard stats for the logged-in owner."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    owner_id = session.get('user_id')
+
+    try:
+        result = await db.execute_query(queries.OWNER_STATS, (owner_id,))
+        return jsonify(responses.counter_stats(
+            result, ('total_properties', 'rented_properties', 'available_properties')
+        ))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/stats: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/owner/analytics')
+async def owner_analytics():
+    """Occupancy and yield metrics for the logged-in owner's portfolio."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    owner_id = session.get('user_id')
+
+    try:
+        months = request.args.get('months', 12, type=int)
+        async with analytics_lock:
+            result = await asyncio.to_thread(portfolio_analytics.report, owner_id, months)
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/analytics: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/owner/property/<int:property_id>', methods=['GET'])
+async def get_owner_property_details(property_id):
+    """Get details for a single property, verifying ownership."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    owner_id = session.get('user_id')
+
+    try:
+        result = await db.execute_query(queries.OWNER_PROPERTY_DETAILS, (property_id, owner_id))
+
+        if result['success'] and len(result['data']) > 0:
+            return jsonify({'success': True, 'data': result['data'][0]})
+        elif result['success']:
+            return jsonify({'success': False, 'error': 'Property not found or not owned by you'})
+        else:
+            return jsonify(result) # Send back the database error
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/property/<id>: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/owner/property', methods=['POST'])
+async def create_property():
+    """Create new property"""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    data = await request.get_json()
+    owner_id = session.get('user_id')
+
+    params = (
+        owner_id,
+        data.get('address'),
+        data.get('city'),
+        data.get('description'),
+        data.get('sq_footage'),
+        data.get('monthly_rent')
+    )
+
+    result = await db.execute_query(queries.CREATE_PROPERTY, params, fetch=False)
+    return jsonify(responses.with_message(result, 'Property created successfully with status: Available'))
+
+@app.route('/api/owner/property/<int:property_id>', methods=['PUT'])
+async def update_property(property_id):
+    """Update property"""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    data = await request.get_json()
+    owner_id = session.get('user_id')
+
+    try:
+        check = await db.execute_query(queries.PROPERTY_OWNER, (property_id,))
+
+        if not check['success'] or len(check['data']) == 0:
+            return jsonify({'success': False, 'error': 'Property not found'})
+
+        if check['data'][0]['owner_id'] != owner_id:
+            return jsonify({'success': False, 'error': 'Unauthorized'})
+
+        params = (
+            data.get('address'),
+            data.get('city'),
+            data.get('description'),
+            data.get('sq_footage'),
+            data.get('monthly_rent'),
+            data.get('status'),
+            property_id
+        )
+
+        result = await db.execute_query(queries.UPDATE_PROPERTY, params, fetch=False)
+
+        if result['success']:
+            listing_cards.invalidate(property_id)
+            result['message'] = 'Property updated successfully'
+
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/property/PUT: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/owner/property/<int:property_id>', methods=['DELETE'])
+async def delete_property(property_id):
+    """Delete property"""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    owner_id = session.get('user_id')
+
+    try:
+        check = await db.execute_query(queries.PROPERTY_OWNER, (property_id,))
+
+        if not check['success'] or len(check['data']) == 0:
+            return jsonify({'success': False, 'error': 'Property not found'})
+
+        if check['data'][0]['owner_id'] != owner_id:
+            return jsonify({'success': False, 'error': 'Unauthorized'})
+
+        # We must delete child records first
+
+        # Find occupancy records to delete payments
+        occ_result = await db.execute_query(queries.PROPERTY_OCCUPANCY_IDS, (property_id,))
+
+        if occ_result['success'] and occ_result['data']:
+            occ_ids = [row['occupancy_id'] for row in occ_result['data']]
+            await db.execute_query(queries.delete_payments(occ_ids), (), fetch=False)
+
+        # Now delete reviews, occupancy, and finally the property
+        await db.execute_query(queries.DELETE_PROPERTY_REVIEWS, (property_id,), fetch=False)
+        await db.execute_query(queries.DELETE_PROPERTY_OCCUPANCIES, (property_id,), fetch=False)
+        result = await db.execute_query(queries.DELETE_PROPERTY, (property_id,), fetch=False)
+
+        availability.invalidate(property_id)
+        if result['success']:
+            listing_cards.invalidate(property_id)
+            result['message'] = 'Property and all related records deleted successfully'
+
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/property/DELETE: {e}")
+        return jsonify({'success': False, 'error': 'A database error occurred during deletion.'})
+
+
+@app.route('/api/owner/all_tenants')
+async def get_all_tenants():
+    """Fetches all tenants to populate a dropdown."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    try:
+        result = await db.execute_query(queries.ALL_TENANTS, ())
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/all_tenants: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/owner/assign_tenant', methods=['POST'])
+async def assign_tenant():
+    """Assigns a tenant to a property by creating an OCCUPANCY record."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    data = await request.get_json()
+    property_id = responses.id_field(data, 'property_id')
+    tenant_id = data.get('tenant_id')
+    owner_id = session.get('user_id')
+    if property_id is None:
+        return jsonify({'success': False, 'error': responses.PROPERTY_ID_ERROR})
+
+    try:
+        check = await db.execute_query(queries.PROPERTY_OWNER_STATUS, (property_id,))
+
+        if not check['success'] or not check['data']:
+            return jsonify({'success': False, 'error': 'Property not found'})
+        if check['data'][0]['owner_id'] != owner_id:
+            return jsonify({'success': False, 'error': 'Unauthorized'})
+        if check['data'][0]['status'] != 'Available':
+             return jsonify({'success': False, 'error': 'Property is already rented'})
+
+        # Check for same-day re-assignment
+        duplicate_check = await db.execute_query(queries.SAME_DAY_ASSIGNMENT, (tenant_id, property_id))
+
+        if duplicate_check['success'] and len(duplicate_check['data']) > 0:
+            return jsonify({
+                'success': False,
+                'error': 'This tenant was already assigned to this property today.'
+            })
+
+        # Same call shape as the sync route (the INSERT fires a trigger)
+        result = await db.execute_query(queries.ASSIGN_TENANT, (tenant_id, property_id), fetch=True)
+        availability.invalidate(property_id)
+        return jsonify(responses.with_message(result, 'Tenant assigned successfully! Property is now Rented.'))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/assign_tenant: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/owner/end_tenancy', methods=['POST'])
+async def end_tenancy():
+    """Ends a tenancy by calling the sp_checkout_tenant stored procedure."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    data = await request.get_json()
+    occupancy_id = data.get('occupancy_id')
+    owner_id = session.get('user_id')
+
+    try:
+        check = await db.execute_query(queries.OCCUPANCY_OWNER, (occupancy_id,))
+
+        if not check['success'] or not check['data']:
+             return jsonify({'success': False, 'error': 'Occupancy record not found.'})
+        if check['data'][0]['owner_id'] != owner_id:
+            return jsonify({'success': False, 'error': 'Unauthorized'})
+
+        result = await db.execute_query(queries.CHECKOUT_TENANT, (occupancy_id,), fetch=True)
+        availability.invalidate(check['data'][0]['property_id'])
+        return jsonify(responses.with_message(result, 'Tenancy ended. Property is now Available.'))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/end_tenancy: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/owner/payments')
+async def get_owner_payments():
+    """Get all payments for a specific owner, filterable by month."""
+    if session.get('role') != 'owner':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    owner_id = session.get('user_id')
+
+    # Default to the current month if not provided
+    selected_month = request.args.get('month', datetime.now().strftime('%Y-%m'))
+
+    try:
+        result = await db.execute_query(queries.OWNER_PAYMENTS, (owner_id, selected_month))
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/owner/payments: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+# ==================== TENANT ROUTES ====================
+
+@app.route('/tenant')
+async def tenant_dashboard():
+    """Tenant dashboard"""
+    if session.get('role') != 'tenant':
+        return redirect(url_for('index'))
+    return await render_template('tenant_dashboard.html')
+
+@app.route('/api/tenant/rentals')
+async def tenant_rentals():
+    """Get tenant's current and past rentals. Rentals and payments are fetched concurrently."""
+    if session.get('role') != 'tenant':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    tenant_id = session.get('user_id')
+
+    try:
+        rental_result, payment_result = await asyncio.gather(
+            db.execute_query(queries.TENANT_RENTALS, (tenant_id,)),
+            db.execute_query(queries.TENANT_RENTAL_PAYMENTS, (tenant_id,))
+        )
+        if not rental_result['success']:
+            return jsonify(rental_result)
+
+        responses.attach_payments(rental_result['data'], payment_result)
+        return jsonify(rental_result)
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/tenant/rentals: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/tenant/ledger')
+async def tenant_ledger():
+    """
+    One summary row per occupancy with rent due, balance, last payment and
+    late count computed in the database. Payment history is served separately
+    by /api/tenant/payments, so this payload does not grow with tenure.
+    """
+    if session.get('role') != 'tenant':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    tenant_id = session.get('user_id')
+    current_month = datetime.now().strftime('%Y-%m')
+
+    try:
+        result = await db.execute_query(queries.TENANT_LEDGER, (current_month, tenant_id, tenant_id))
+        return jsonify(responses.ledger_rows(result))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/tenant/ledger: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/tenant/payments')
+async def tenant_payments():
+    """
+    Paginated, date-bounded payment history.
+    Query args: occupancy_id (optional), from / to (YYYY-MM-DD, default: the last 12 months),
+    page (default 1), per_page (default 20, max 100).
+    """
+    if session.get('role') != 'tenant':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    tenant_id = session.get('user_id')
+
+    try:
+        date_from, date_to = responses.payment_window(request.args)
+    except (ValueError, OverflowError):
+        return jsonify({'success': False, 'error': responses.PAYMENT_DATES_ERROR})
+
+    page, per_page, occupancy_id = responses.paging(request.args)
+    query, params = queries.tenant_payments(tenant_id, date_from, date_to, occupancy_id, page, per_page)
+
+    try:
+        result = await db.execute_query(query, params)
+        return jsonify(responses.payments_page(result, page, per_page, date_from, date_to))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/tenant/payments: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/tenant/make_payment', methods=['POST'])
+async def make_payment():
+    """Simulates making a payment for a specific occupancy."""
+    if session.get('role') != 'tenant':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    data = await request.get_json()
+    occupancy_id = data.get('occupancy_id')
+    tenant_id = session.get('user_id')
+
+    try:
+        check = await db.execute_query(queries.OCCUPANCY_TENANT, (occupancy_id,))
+
+        if not check['success'] or not check['data']:
+            return jsonify({'success': False, 'error': 'Occupancy record not found.'})
+        if check['data'][0]['tenant_id'] != tenant_id:
+            return jsonify({'success': False, 'error': 'Unauthorized action.'})
+
+        params = (
+            occupancy_id,
+            data.get('amount'),
+            data.get('month_year'),
+            data.get('method')
+        )
+
+        result = await db.execute_query(queries.MAKE_PAYMENT, params, fetch=False)
+        return jsonify(responses.with_message(result, 'Payment successful!'))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/tenant/make_payment: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/tenant/review', methods=['POST'])
+async def submit_review():
+    """Submit review for property"""
+    if session.get('role') != 'tenant':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    data = await request.get_json()
+    tenant_id = session.get('user_id')
+    property_id = responses.id_field(data, 'property_id')
+    if property_id is None:
+        return jsonify({'success': False, 'error': responses.PROPERTY_ID_ERROR})
+
+    params = (
+        tenant_id,
+        property_id,
+        data.get('rating'),
+        data.get('comment')
+    )
+
+    result = await db.execute_query(queries.SUBMIT_REVIEW, params, fetch=False)
+
+    if result['success']:
+        # The card shows the average rating
+        listing_cards.invalidate(property_id)
+
+    return jsonify(responses.review_result(result))
+
+
+@app.route('/api/tenant/request-rent', methods=['POST'])
+async def request_rent():
+    """Request to rent a property"""
+    if session.get('role') != 'tenant':
+        return jsonify({'success': False, 'error': 'Unauthorized'})
+
+    data = await request.get_json()
+    tenant_id = session.get('user_id')
+    property_id = responses.id_field(data, 'property_id')
+    if property_id is None:
+        return jsonify({'success': False, 'error': responses.PROPERTY_ID_ERROR})
+
+    try:
+        check = await db.execute_query(queries.PROPERTY_STATUS, (property_id,))
+
+        if not check['success'] or len(check['data']) == 0:
+            return jsonify({'success': False, 'error': 'Property not found'})
+
+        if check['data'][0]['status'] != 'Available':
+            return jsonify({'success': False, 'error': 'Property is not available'})
+
+        # Same call shape as the sync route (the INSERT fires a trigger)
+        result = await db.execute_query(queries.REQUEST_RENT, (tenant_id, property_id), fetch=True)
+        availability.invalidate(property_id)
+        return jsonify(responses.with_message(result, 'Rental request successful! Property status updated to Rented.'))
+
+    except Exception as e:
+        print(f"!!! ERROR in /api/tenant/request-rent: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== BROWSE PROPERTIES ====================
+
+@app.route('/api/properties/browse')
+async def browse_properties():
+    """Browse all available properties, NO NESTED QUERIES."""
+    try:
+        if listing_snapshot.ready:
+            rows = await asyncio.to_thread(listing_snapshot.browse_rows)
+            return jsonify({'success': True, 'data': rows, 'messages': []})
+        result = await report_queries.execute_query(queries.BROWSE_PROPERTIES, ())
+        return jsonify(result)
+    except Exception as e:
+        print(f"!!! ERROR in /api/properties/browse: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/properties/available')
+async def available_properties():
+    """
+    Properties with no tenancy overlapping a date range, e.g.
+    /api/properties/available?from=2025-12-01&to=2026-05-31 (to defaults to from).
+    """
+    try:
+        first_day, last_day = responses.date_range(request.args, 0)
+    except (ValueError, OverflowError):
+        return jsonify({'success': False, 'error': responses.DATE_RANGE_ERROR})
+
+    try:
+        result = await report_queries.execute_query(queries.RENTABLE_PROPERTIES, ())
+        if not result['success']:
+            return jsonify(result)
+
+        free_ids = await asyncio.to_thread(
+            availability.available, [row['property_id'] for row in result['data']], first_day, last_day
+        )
+        return jsonify(responses.available_listing(result['data'], free_ids, first_day, last_day))
+    except Exception as e:
+        print(f"!!! ERROR in /api/properties/available: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/properties/<int:property_id>/calendar')
+async def property_calendar(property_id):
+    """
+    Occupied and free date ranges of one property between from (default today)
+    and to (default 180 days later), e.g. /api/properties/303/calendar?from=2025-12-01
+    """
+    try:
+        first_day, last_day = responses.date_range(request.args, 180)
+    except (ValueError, OverflowError):
+        return jsonify({'success': False, 'error': responses.DATE_RANGE_ERROR})
+
+    try:
+        check = await db.execute_query(queries.PROPERTY_STATUS, (property_id,))
+        if not check['success']:
+            return jsonify(check)
+        if not check['data']:
+            return jsonify({'success': False, 'error': 'Property not found'})
+
+        calendar = await asyncio.to_thread(availability.calendar, property_id, first_day, last_day)
+        return jsonify(responses.property_calendar(
+            property_id, check['data'][0]['status'], calendar, first_day, last_day
+        ))
+    except Exception as e:
+        print(f"!!! ERROR in /api/properties/<id>/calendar: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== MAIN RUN ====================
+
+if __name__ == '__main__':
+    debug_mode = os.getenv('FLASK_DEBUG', 'False') == 'True'
+    app.run(debug=debug_mode, port=5000)
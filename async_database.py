@@ -0,0 +1,138 @@
+import aiomysql
+from aiomysql import Error
+import os
+import time
+
+STREAM_CHUNK_SIZE = 100
+
+class AsyncDatabase:
+    """
+    asyncio counterpart of Database backed by an aiomysql connection pool.
+    execute_query / call_procedure return exactly the same result dicts.
+    """
+    def __init__(self):
+        self.host = os.getenv('DB_HOST', 'localhost')
+        self.user = os.getenv('DB_USER', 'root')
+        self.password = os.getenv('DB_PASSWORD', 'password')
+        self.database = os.getenv('DB_NAME', 'rental_db')
+        self.pool_size = int(os.getenv('DB_POOL_SIZE', '20'))
+        self.pool = None
+        # Callables notified as listener(query, params, elapsed) after every statement
+        self.listeners = []
+
+
+    async def connect(self):
+        try:
+            # Autocommit: the sync app relies on one shared connection, where a later
+            # commit also persists earlier statements run with fetch=True. Pooled
+            # connections give no such guarantee, so every statement commits itself.
+            self.pool = await aiomysql.create_pool(
+                host=self.host,
+                user=self.user,
+                password=self.password,
+                db=self.database,
+                minsize=1,
+                maxsize=self.pool_size,
+                autocommit=True
+            )
+            return True
+        except Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            return False
+
+    async def disconnect(self):
+        if self.pool:
+            self.pool.close()
+            await self.pool.wait_closed()
+
+    def _notify(self, query, params, started):
+        """Report a finished statement to the registered listeners"""
+        if self.listeners:
+            elapsed = time.perf_counter() - started
+            for listener in self.listeners:
+                listener(query, params, elapsed)
+
+    async def execute_query(self, query, params=None, fetch=True):
+        """Execute a query and optionally fetch results"""
+        started = time.perf_counter()
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query, params or ())
+
+                    if fetch:
+                        result = list(await cursor.fetchall())
+                        self._notify(query, params, started)
+                        return {'success': True, 'data': result, 'messages': []}
+
+                    await conn.commit()
+                    self._notify(query, params, started)
+                    affected_rows = cursor.rowcount
+                    last_id = cursor.lastrowid
+                    # Get any messages from triggers/procedures
+                    messages = []
+                    try:
+                        started = time.perf_counter()
+                        await cursor.execute("SHOW WARNINGS")
+                        warnings = await cursor.fetchall()
+                        self._notify("SHOW WARNINGS", None, started)
+                        for warning in warnings:
+                            messages.append(warning.get('Message', ''))
+                    except Error:
+                        pass
+
+                    return {
+                        'success': True,
+                        'affected_rows': affected_rows,
+                        'last_id': last_id,
+                        'messages': messages
+                    }
+        except Error as e:
+            self._notify(query, params, started)
+            return {'success': False, 'error': str(e), 'messages': []}
+
+    async def call_procedure(self, proc_name, params=None):
+        """Call a stored procedure"""
+        started = time.perf_counter()
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.callproc(proc_name, params or ())
+
+                    # Fetch results if any
+                    results = []
+                    while True:
+                        rows = await cursor.fetchall()
+                        if rows:
+                            results.extend(rows)
+                        if not await cursor.nextset():
+                            break
+
+                    await conn.commit()
+                    self._notify(f"CALL {proc_name}", params, started)
+                    return {'success': True, 'data': results, 'messages': []}
+        except Error as e:
+            self._notify(f"CALL {proc_name}", params, started)
+            return {'success': False, 'error': str(e), 'messages': []}
+
+    async def stream_query(self, query, params=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Yield the result rows in lists of up to chunk_size from an unbuffered
+        cursor on a pooled connection, so at most one chunk is held in memory.
+        Listeners are notified once the stream ends; a database error ends it early.
+        """
+        started = time.perf_counter()
+        try:
+            async with self.pool.acquire() as conn:
+                # SSDictCursor drains unread rows on close, so the connection goes back clean
+                async with conn.cursor(aiomysql.SSDictCursor) as cursor:
+                    await cursor.execute(query, params or ())
+                    while True:
+                        rows = await cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        yield list(rows)
+        except Error as e:
+            print(f"Error streaming query: {e}")
+        finally:
+            self._notify(query, params, started)
@@ -0,0 +1,140 @@
+"""
+Interval index over OCCUPANCY periods, for date-range availability search
+and per-property calendars.
+
+Each property keeps its occupancy periods merged into disjoint half-open
+[start, end) intervals held as two sorted lists, so an overlap test is one
+bisect: O(log n) in the property's history instead of an OCCUPANCY scan.
+A tenancy occupies its start_date up to, not including, its end_date (the
+checkout day is free for the next tenant); one without an end_date runs
+open-ended.
+
+The index is read from OCCUPANCY on first use. After that a write only
+marks the affected properties stale, and just those rows are re-read,
+with one indexed query, before the next lookup.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+OPEN_END = date.max  # end of a tenancy that is still running
+ONE_DAY = timedelta(days=1)
+
+
+def merge_periods(periods):
+    """Sorted, disjoint (starts, ends) lists from (start, end) pairs"""
+    starts, ends = [], []
+    for start, end in sorted(periods):
+        if start >= end:
+            continue
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+def _index_rows(rows):
+    periods = {}
+    for row in rows:
+        periods.setdefault(row['property_id'], []).append(
+            (row['start_date'], row['end_date'] or OPEN_END)
+        )
+    return {property_id: merge_periods(items) for property_id, items in periods.items()}
+
+
+class AvailabilityIndex:
+    """Per-property occupancy intervals with logarithmic overlap queries"""
+
+    def __init__(self, db):
+        self.db = db
+        self._periods = {}    # property_id -> (starts, ends)
+        self._stale = set()   # property ids to re-read before the next lookup
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def invalidate(self, *property_ids):
+        """Occupancy of these properties changed; re-read them on the next lookup"""
+        with self._lock:
+            # Routes pass ids straight from request JSON ("303"); the index is keyed by int
+            self._stale.update(int(property_id) for property_id in property_ids if property_id is not None)
+
+    def clear(self):
+        """Drop everything; the next lookup reloads the whole table"""
+        with self._lock:
+            self._periods = {}
+            self._stale.clear()
+            self._loaded = False
+
+    def _ensure_current(self):
+        """Load or catch up; callers hold self._lock"""
+        if not self._loaded:
+            result = self.db.execute_query("SELECT property_id, start_date, end_date FROM OCCUPANCY", ())
+            if not result['success']:
+                raise RuntimeError(result.get('error'))
+            self._periods = _index_rows(result['data'])
+            self._stale.clear()
+            self._loaded = True
+        elif self._stale:
+            property_ids = list(self._stale)
+            placeholders = ','.join(['%s'] * len(property_ids))
+            result = self.db.execute_query(
+                f"SELECT property_id, start_date, end_date FROM OCCUPANCY WHERE property_id IN ({placeholders})",
+                tuple(property_ids)
+            )
+            if not result['success']:
+                raise RuntimeError(result.get('error'))
+            fresh = _index_rows(result['data'])
+            for property_id in property_ids:
+                if property_id in fresh:
+                    self._periods[property_id] = fresh[property_id]
+                else:
+                    self._periods.pop(property_id, None)
+            self._stale.clear()
+
+    def _is_free(self, property_id, start, end):
+        starts, ends = self._periods.get(property_id, ((), ()))
+        # First period ending after `start`; it overlaps unless it begins at or after `end`
+        i = bisect_right(ends, start)
+        return i == len(starts) or starts[i] >= end
+
+    def available(self, property_ids, first_day, last_day):
+        """The given properties that are free on every day from first_day to last_day"""
+        end = _day_after(last_day)
+        with self._lock:
+            self._ensure_current()
+            return [property_id for property_id in property_ids
+                    if self._is_free(property_id, first_day, end)]
+
+    def calendar(self, property_id, first_day, last_day):
+        """Consecutive occupied / free ranges covering first_day..last_day (inclusive dates)"""
+        end = _day_after(last_day)
+        with self._lock:
+            self._ensure_current()
+            starts, ends = self._periods.get(property_id, ((), ()))
+            i = bisect_right(ends, first_day)
+            j = bisect_left(starts, end)
+            occupied = [(max(starts[k], first_day), min(ends[k], end)) for k in range(i, j)]
+
+        def span(start, stop, status):
+            # stop is exclusive; a range reaching `end` runs through last_day (date.max included)
+            to = last_day if stop >= end else stop - ONE_DAY
+            return {'from': start.isoformat(), 'to': to.isoformat(), 'status': status}
+
+        ranges = []
+        cursor = first_day
+        for start, stop in occupied:
+            if cursor < start:
+                ranges.append(span(cursor, start, 'free'))
+            ranges.append(span(start, stop, 'occupied'))
+            cursor = stop
+        if cursor < end:
+            ranges.append(span(cursor, end, 'free'))
+        return ranges
+
+
+def _day_after(day):
+    # date.max has no next day; OPEN_END already stands for "never ends"
+    return day + ONE_DAY if day < OPEN_END else OPEN_END
+
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+
+# Seconds between outbox polls; bounds how stale another worker's writes can look (0 disables the poller)
+CHANGE_FEED_INTERVAL = float(os.getenv('CHANGE_FEED_INTERVAL', '1'))
+CHANGE_FEED_BATCH = 1000
+# Seconds a skipped event id is re-checked; an id still missing by then was rolled back
+CHANGE_FEED_GAP_TIMEOUT = float(os.getenv('CHANGE_FEED_GAP_TIMEOUT', '60'))
+# Most skipped ids re-checked at once; a jump that does not fit is taken as rolled back
+CHANGE_FEED_MAX_GAPS = int(os.getenv('CHANGE_FEED_MAX_GAPS', '1000'))
+
+EVENT_COLUMNS = "event_id, table_name, row_key, property_id"
+
+
+class ChangeFeed:
+    """
+    Per-worker consumer of the CHANGE_OUTBOX table.
+    A background thread polls for events newer than the last one seen and
+    hands them, grouped by table, to the callbacks subscribed to that table.
+    Needs its own autocommit connection so every poll sees new commits.
+
+    Event ids are assigned at insert but become visible at commit, so a
+    long transaction (e.g. sp_checkout_tenant and its triggers) can commit
+    an id below one already consumed. Ids skipped over are remembered and
+    re-read on every poll until they appear or gap_timeout passes. At most
+    max_gaps ids are tracked: a larger jump (a rolled-back bulk write, or
+    auto_increment_increment > 1 filling the set) is counted in gaps_dropped
+    and not re-read.
+    """
+
+    def __init__(self, db, interval=CHANGE_FEED_INTERVAL, batch_size=CHANGE_FEED_BATCH,
+                 gap_timeout=CHANGE_FEED_GAP_TIMEOUT, max_gaps=CHANGE_FEED_MAX_GAPS):
+        self.db = db
+        self.interval = interval
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.max_gaps = max_gaps
+        self.last_event_id = None
+        self.events_seen = 0
+        self.late_events = 0    # events that committed after a higher id had been consumed
+        self.gaps_dropped = 0   # skipped ids not tracked because they did not fit in max_gaps
+        self._gaps = {}         # skipped event_id -> time it was first missed
+        self._subscribers = {}  # table name -> [callback(events)]
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, table_names, callback):
+        """callback(events) receives a list of {'event_id', 'table_name', 'row_key', 'property_id'} dicts"""
+        for table_name in table_names:
+            self._subscribers.setdefault(table_name, []).append(callback)
+
+    def start(self):
+        """Connect and start polling from the current end of the outbox"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        if not self.db.connect():
+            return
+        if not self.skip_to_end():
+            return
+        self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+        self._thread.start()
+
+    def skip_to_end(self):
+        """Continue from the current end of the outbox, e.g. after the caches were emptied"""
+        result = self.db.execute_query("SELECT COALESCE(MAX(event_id), 0) AS last_event_id FROM CHANGE_OUTBOX", ())
+        if not result['success']:
+            print(f"!!! ERROR starting change feed: {result.get('error')}")
+            return False
+        # Caches start empty, so history before this point is irrelevant
+        with self._lock:
+            self.last_event_id = result['data'][0]['last_event_id']
+            self._gaps.clear()
+        return True
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"!!! ERROR polling change feed: {e}")
+
+    def poll(self):
+        """Consume every pending event; also called right after a local write"""
+        if self.last_event_id is None:
+            return 0
+        with self._lock:
+            consumed = self._poll_gaps()
+            while True:
+                result = self.db.execute_query(f"""
+                    SELECT {EVENT_COLUMNS}
+                    FROM CHANGE_OUTBOX
+                    WHERE event_id > %s
+                    ORDER BY event_id
+                    LIMIT %s
+                """, (self.last_event_id, self.batch_size))
+                if not result['success'] or not result['data']:
+                    break
+
+                events = result['data']
+                self._track_gaps(events)
+                self._dispatch(events)
+                self.last_event_id = events[-1]['event_id']
+                consumed += len(events)
+                if len(events) < self.batch_size:
+                    break
+            self.events_seen += consumed
+            return consumed
+
+    def _track_gaps(self, events):
+        """Remember ids skipped between the last consumed event and this batch"""
+        now = time.monotonic()
+        expected = self.last_event_id + 1
+        for event in events:
+            skipped = event['event_id'] - expected
+            if 0 < skipped <= self.max_gaps - len(self._gaps):
+                for missing in range(expected, event['event_id']):
+                    self._gaps[missing] = now
+            elif skipped > 0:
+                self.gaps_dropped += skipped
+            expected = event['event_id'] + 1
+
+    def _poll_gaps(self):
+        """Consume skipped events that have committed since; forget ids past the timeout"""
+        if not self._gaps:
+            return 0
+        expired_before = time.monotonic() - self.gap_timeout
+        for event_id in [event_id for event_id, missed_at in self._gaps.items() if missed_at < expired_before]:
+            del self._gaps[event_id]
+        if not self._gaps:
+            return 0
+
+        gap_ids = list(self._gaps)
+        placeholders = ','.join(['%s'] * len(gap_ids))
+        result = self.db.execute_query(
+            f"SELECT {EVENT_COLUMNS} FROM CHANGE_OUTBOX WHERE event_id IN ({placeholders}) ORDER BY event_id",
+            tuple(gap_ids)
+        )
+        if not result['success'] or not result['data']:
+            return 0
+        events = result['data']
+        for event in events:
+            del self._gaps[event['event_id']]
+        self._dispatch(events)
+        self.late_events += len(events)
+        return len(events)
+
+    def _dispatch(self, events):
+        by_table = {}
+        for event in events:
+            by_table.setdefault(event['table_name'], []).append(event)
+        for table_name, table_events in by_table.items():
+            for callback in self._subscribers.get(table_name, []):
+                try:
+                    callback(table_events)
+                except Exception as e:
+                    print(f"!!! ERROR in change feed subscriber for {table_name}: {e}")
+
+def property_ids(events):
+    """Distinct affected property ids of a batch of events"""
+    return {event['property_id'] for event in events if event['property_id'] is not None}
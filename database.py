@@ -1,14 +1,33 @@
 import mysql.connector
 from mysql.connector import Error
 import os
+import threading
+import time
+
+# Connections kept for stream_query; a stream holds one until it is fully read
+STREAM_POOL_SIZE = int(os.getenv('DB_STREAM_POOL_SIZE', '4'))
+# Seconds a stream waits for a free connection before it is read buffered instead
+STREAM_POOL_WAIT = float(os.getenv('DB_STREAM_POOL_WAIT', '2'))
+STREAM_CHUNK_SIZE = 100
 
 class Database:
-    def __init__(self):
+    def __init__(self, autocommit=False):
         self.host = os.getenv('DB_HOST', 'localhost')
         self.user = os.getenv('DB_USER', 'root')
         self.password = os.getenv('DB_PASSWORD', 'password') 
         self.database = os.getenv('DB_NAME', 'rental_db')
+        # With autocommit every read sees the latest commits instead of one long transaction snapshot
+        self.autocommit = autocommit
         self.connection = None
+        # Idle stream connections; at most STREAM_POOL_SIZE exist, in use or idle
+        self._stream_idle = []
+        self._stream_slots = threading.BoundedSemaphore(STREAM_POOL_SIZE)
+        self._stream_lock = threading.Lock()
+        self._stream_generation = 0  # bumped by disconnect(); older connections are closed on return
+        # Callables notified as listener(query, params, elapsed) after every statement
+        self.listeners = []
+        # Callables notified as listener(query, params, error) when a statement fails
+        self.error_listeners = []
     
     
     def connect(self):
@@ -17,7 +36,8 @@ class Database:
                 host=self.host,
                 user=self.user,
                 password=self.password,
-                database=self.database
+                database=self.database,
+                autocommit=self.autocommit
             )
             if self.connection.is_connected():
                 return True
@@ -28,24 +48,50 @@ class Database:
     def disconnect(self):
         if self.connection and self.connection.is_connected():
             self.connection.close()
+        # Stream connections are closed too: idle ones now, busy ones when their stream ends
+        with self._stream_lock:
+            idle, self._stream_idle = self._stream_idle, []
+            self._stream_generation += 1
+        for connection, generation in idle:
+            try:
+                connection.close()
+            except Error as e:
+                print(f"Error closing stream connection: {e}")
+    
+    def _notify(self, query, params, started):
+        """Report a finished statement to the registered listeners"""
+        if self.listeners:
+            elapsed = time.perf_counter() - started
+            for listener in self.listeners:
+                listener(query, params, elapsed)
+    
+    def _notify_error(self, query, params, error):
+        """Report a failed statement to the registered error listeners"""
+        for listener in self.error_listeners:
+            listener(query, params, error)
     
     def execute_query(self, query, params=None, fetch=True):
         """Execute a query and optionally fetch results"""
         cursor = None
+        started = time.perf_counter()
         try:
             cursor = self.connection.cursor(dictionary=True)
             cursor.execute(query, params or ())
             
             if fetch:
                 result = cursor.fetchall()
+                self._notify(query, params, started)
                 return {'success': True, 'data': result, 'messages': []}
             else:
                 self.connection.commit()
+                self._notify(query, params, started)
                 # Get any messages from triggers/procedures
                 messages = []
                 try:
+                    started = time.perf_counter()
                     cursor.execute("SHOW WARNINGS")
                     warnings = cursor.fetchall()
+                    self._notify("SHOW WARNINGS", None, started)
                     for warning in warnings:
                         messages.append(warning.get('Message', ''))
                 except:
@@ -58,6 +104,8 @@ class Database:
                     'messages': messages
                 }
         except Error as e:
+            self._notify(query, params, started)
+            self._notify_error(query, params, e)
             return {'success': False, 'error': str(e), 'messages': []}
         finally:
             if cursor:
@@ -66,6 +114,7 @@ class Database:
     def call_procedure(self, proc_name, params=None):
         """Call a stored procedure"""
         cursor = None
+        started = time.perf_counter()
         try:
             cursor = self.connection.cursor(dictionary=True)
             cursor.callproc(proc_name, params or ())
@@ -76,9 +125,102 @@ class Database:
                 results.extend(result.fetchall())
             
             self.connection.commit()
+            self._notify(f"CALL {proc_name}", params, started)
             return {'success': True, 'data': results, 'messages': []}
         except Error as e:
+            self._notify(f"CALL {proc_name}", params, started)
+            self._notify_error(f"CALL {proc_name}", params, e)
             return {'success': False, 'error': str(e), 'messages': []}
         finally:
             if cursor:
                 cursor.close()
+    
+    def _stream_connection(self):
+        """
+        A connection of its own, so a long-running stream never blocks self.connection.
+        Returns (connection, generation), or None when all STREAM_POOL_SIZE are
+        still streaming after STREAM_POOL_WAIT seconds.
+        """
+        if not self._stream_slots.acquire(timeout=STREAM_POOL_WAIT):
+            return None
+        try:
+            with self._stream_lock:
+                generation = self._stream_generation
+                while self._stream_idle:
+                    connection, idle_generation = self._stream_idle.pop()
+                    if connection.is_connected():
+                        return connection, idle_generation
+            connection = mysql.connector.connect(
+                host=self.host, user=self.user, password=self.password,
+                database=self.database, autocommit=True
+            )
+            return connection, generation
+        except BaseException:
+            self._stream_slots.release()
+            raise
+
+    def _release_stream_connection(self, connection, generation, reusable):
+        """Keep a drained connection for the next stream unless disconnect() ran meanwhile"""
+        try:
+            with self._stream_lock:
+                if reusable and generation == self._stream_generation and connection.is_connected():
+                    self._stream_idle.append((connection, generation))
+                    return
+            connection.close()
+        except Error as e:
+            print(f"Error closing stream connection: {e}")
+        finally:
+            self._stream_slots.release()
+
+    def stream_query(self, query, params=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Yield the result rows in lists of up to chunk_size from an unbuffered
+        cursor, so at most one chunk is held in memory. Listeners are notified
+        once the stream ends; a database error ends the stream early and is
+        reported to the error listeners. When every stream connection stays
+        busy the rows are read buffered on self.connection instead, so a burst
+        of streams never opens more than STREAM_POOL_SIZE connections.
+        """
+        started = time.perf_counter()
+        acquired = None
+        cursor = None
+        finished = False
+        try:
+            acquired = self._stream_connection()
+            if acquired is None:
+                result = self.execute_query(query, params)
+                if not result['success']:
+                    print(f"Error streaming query: {result['error']}")
+                    return
+                rows = result['data']
+                for first in range(0, len(rows), chunk_size):
+                    yield rows[first:first + chunk_size]
+                return
+            connection = acquired[0]
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+            finished = True
+        except Error as e:
+            print(f"Error streaming query: {e}")
+            self._notify_error(query, params, e)
+        finally:
+            # The buffered fallback was reported by execute_query itself
+            if acquired is not None:
+                connection, generation = acquired
+                reusable = True
+                try:
+                    if not finished:
+                        # Abandoned mid-stream (e.g. client went away): drain before reuse
+                        connection.consume_results()
+                    if cursor:
+                        cursor.close()
+                except Error as e:
+                    print(f"Error closing query stream: {e}")
+                    reusable = False
+                self._release_stream_connection(connection, generation, reusable)
+                self._notify(query, params, started)
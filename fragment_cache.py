@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from markupsafe import Markup
+
+FRAGMENT_CACHE_SIZE = int(os.getenv('FRAGMENT_CACHE_SIZE', '5000'))
+
+
+class FragmentCache:
+    """
+    LRU cache of rendered template fragments, one entry per key.
+    Each entry remembers the row version it was rendered from, so a row whose
+    data changed (including joined owner contact or rating) is re-rendered on
+    its next use even if nobody invalidated it explicitly.
+    """
+
+    def __init__(self, template_name, max_entries=FRAGMENT_CACHE_SIZE):
+        self.template_name = template_name
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (row version, rendered Markup)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Callables notified as listener(template_name, elapsed) after every render on a miss
+        self.listeners = []
+
+    @staticmethod
+    def row_version(row):
+        """Version of a row: changes whenever any column the fragment may show changes"""
+        return hash(tuple(row.items()))
+
+    def render(self, jinja_env, key, row):
+        """Return the cached fragment for this row, rendering it on a miss"""
+        version = self.row_version(row)
+        html = self._lookup(key, version)
+        if html is None:
+            started = time.perf_counter()
+            html = Markup(jinja_env.get_template(self.template_name).render(prop=row))
+            self._notify(started)
+            self._store(key, version, html)
+        return html
+
+    async def render_async(self, jinja_env, key, row):
+        """render() for async Jinja environments (the Quart app)"""
+        version = self.row_version(row)
+        html = self._lookup(key, version)
+        if html is None:
+            started = time.perf_counter()
+            html = Markup(await jinja_env.get_template(self.template_name).render_async(prop=row))
+            self._notify(started)
+            self._store(key, version, html)
+        return html
+
+    def _notify(self, started):
+        if self.listeners:
+            elapsed = time.perf_counter() - started
+            for listener in self.listeners:
+                listener(self.template_name, elapsed)
+
+    def render_all(self, jinja_env, rows, key_field):
+        return [self.render(jinja_env, row[key_field], row) for row in rows]
+
+    async def render_all_async(self, jinja_env, rows, key_field):
+        return [await self.render_async(jinja_env, row[key_field], row) for row in rows]
+
+    def _lookup(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def _store(self, key, version, html):
+        with self._lock:
+            self._entries[key] = (version, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
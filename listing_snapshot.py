@@ -0,0 +1,399 @@
+"""
+Persisted snapshot of the public listing data (available properties with
+owner contact and average rating).
+
+The snapshot is a compact binary file that every worker memory-maps at
+startup, so a restart serves home() and browse_properties without running
+the full PROPERTY/OWNER/REVIEW join. Rows are decoded from the mapped pages
+on each read, so the listing data itself sits once in the OS page cache for
+all workers; a worker keeps only a property_id -> offset index plus the rows
+it caught up on since the file was last written.
+
+The file carries a version marker (PROPERTY/OWNER updated_at and the last
+REVIEW id); workers catch up from that marker with a few indexed queries,
+and a background thread rewrites the file so the next worker to start is
+warm as well. `python listing_snapshot.py` rebuilds it.
+
+File layout (little endian):
+    header  MAGIC, format version, property marker, owner marker, review marker, row count
+    rows    property_id (uint32), sq_footage (int32, -1 for NULL), then the
+            string columns, each as uint32 length + UTF-8 (0xFFFFFFFF for NULL)
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+
+MAGIC = b'LISTSNAP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIqqqI')
+ROW_HEAD = struct.Struct('<Ii')
+STR_LEN = struct.Struct('<I')
+NULL_LEN = 0xFFFFFFFF
+
+STRING_COLUMNS = ('address', 'city', 'description', 'status', 'monthly_rent',
+                  'owner_name', 'owner_email', 'owner_phone', 'avg_rating')
+DECIMAL_COLUMNS = ('monthly_rent', 'avg_rating')
+
+LISTING_SNAPSHOT_PATH = os.getenv(
+    'LISTING_SNAPSHOT_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots', 'listings.bin')
+)
+LISTING_SNAPSHOT_REFRESH = float(os.getenv('LISTING_SNAPSHOT_REFRESH', '5'))
+
+LISTING_COLUMNS = """
+    p.property_id, p.address, p.city, p.description, p.sq_footage,
+    p.monthly_rent, p.status,
+    o.name AS owner_name, o.email AS owner_email, o.phone AS owner_phone,
+    r.avg_rating
+"""
+
+FULL_QUERY = f"""
+SELECT {LISTING_COLUMNS}
+FROM PROPERTY p
+JOIN OWNER o ON p.owner_id = o.owner_id
+LEFT JOIN (
+    SELECT property_id, AVG(rating) AS avg_rating
+    FROM REVIEW
+    GROUP BY property_id
+) r ON p.property_id = r.property_id
+WHERE p.status = 'Available'
+"""
+
+# Taken before reading rows, so anything written meanwhile is caught by the next catch-up
+MARKER_QUERY = """
+SELECT
+    (SELECT MAX(updated_at) FROM PROPERTY) AS property_marker,
+    (SELECT MAX(updated_at) FROM OWNER) AS owner_marker,
+    (SELECT COALESCE(MAX(review_id), 0) FROM REVIEW) AS review_marker,
+    (SELECT COUNT(*) FROM PROPERTY WHERE status = 'Available') AS available,
+    NOW() AS db_now
+"""
+
+# Timestamps have one-second resolution, so rows stamped exactly at the marker are re-read
+CHANGED_IDS_QUERY = """
+SELECT property_id FROM PROPERTY WHERE updated_at >= %s
+UNION
+SELECT p.property_id FROM PROPERTY p JOIN OWNER o ON p.owner_id = o.owner_id WHERE o.updated_at >= %s
+UNION
+SELECT property_id FROM REVIEW WHERE review_id > %s
+"""
+
+
+def _epoch(value):
+    return int(value.timestamp() * 1_000_000) if value else 0
+
+
+def _from_epoch(value):
+    return datetime.fromtimestamp(value / 1_000_000) if value else datetime.fromtimestamp(0)
+
+
+def encode_rows(rows, markers):
+    """Serialize listing rows and their version marker"""
+    chunks = [HEADER.pack(MAGIC, FORMAT_VERSION, *markers, len(rows))]
+    for row in rows:
+        sq_footage = row['sq_footage'] if row['sq_footage'] is not None else -1
+        chunks.append(ROW_HEAD.pack(row['property_id'], sq_footage))
+        for column in STRING_COLUMNS:
+            value = row[column]
+            if value is None:
+                chunks.append(STR_LEN.pack(NULL_LEN))
+            else:
+                data = str(value).encode('utf-8')
+                chunks.append(STR_LEN.pack(len(data)))
+                chunks.append(data)
+    return b''.join(chunks)
+
+
+def _skip_row(buffer, offset):
+    """Offset just past the row starting at offset"""
+    offset += ROW_HEAD.size
+    for _ in STRING_COLUMNS:
+        (length,) = STR_LEN.unpack_from(buffer, offset)
+        offset += STR_LEN.size + (0 if length == NULL_LEN else length)
+    return offset
+
+
+def index_rows(buffer):
+    """Parse a snapshot buffer into (markers, {property_id: row offset}) without decoding rows"""
+    magic, version, property_marker, owner_marker, review_marker, count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError('Unrecognized listing snapshot format')
+
+    offset = HEADER.size
+    offsets = {}
+    for _ in range(count):
+        property_id, _ = ROW_HEAD.unpack_from(buffer, offset)
+        offsets[property_id] = offset
+        offset = _skip_row(buffer, offset)
+    return (property_marker, owner_marker, review_marker), offsets
+
+
+def decode_row(buffer, offset):
+    """One listing row, decoded from the row starting at offset"""
+    property_id, sq_footage = ROW_HEAD.unpack_from(buffer, offset)
+    offset += ROW_HEAD.size
+    row = {'property_id': property_id, 'sq_footage': None if sq_footage == -1 else sq_footage}
+    for column in STRING_COLUMNS:
+        (length,) = STR_LEN.unpack_from(buffer, offset)
+        offset += STR_LEN.size
+        if length == NULL_LEN:
+            row[column] = None
+            continue
+        value = str(buffer[offset:offset + length], 'utf-8')
+        offset += length
+        row[column] = Decimal(value) if column in DECIMAL_COLUMNS else value
+    return row
+
+
+class _Rows:
+    """
+    One consistent version of the listings: the mapped file plus the rows
+    changed since it was written. A row is either an offset into `mapped`
+    (decoded on demand) or a dict fresh from the database.
+    """
+
+    def __init__(self, markers, rows, mapped=None):
+        self.markers = markers
+        self.rows = rows          # property_id -> offset or row dict
+        self.mapped = mapped
+        self.home_order = None    # cached orderings of self.rows values
+        self.browse_order = None
+
+    def row(self, entry):
+        return decode_row(self.mapped, entry) if isinstance(entry, int) else dict(entry)
+
+    def ordered(self, key):
+        return sorted(self.rows.values(), key=lambda entry: key(self.row(entry)))
+
+
+class ListingSnapshot:
+    """Memory-mapped listing snapshot with incremental catch-up"""
+
+    def __init__(self, db, path=LISTING_SNAPSHOT_PATH, refresh_interval=LISTING_SNAPSHOT_REFRESH):
+        self.db = db
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.ready = False
+        self._state = _Rows((0, 0, 0), {})
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = None       # background thread persisting caught-up rows
+        self._write_wanted = False
+
+    @property
+    def markers(self):
+        return self._state.markers
+
+    # ---------- loading ----------
+
+    def load(self):
+        """Map the snapshot file, building it from the database when missing"""
+        if not self.path:
+            return False
+        try:
+            if not self._map_file():
+                self.rebuild()
+            self._checked_at = time.time()
+            self.ready = True
+        except Exception as e:
+            print(f"!!! ERROR loading listing snapshot: {e}")
+            self.ready = False
+        return self.ready
+
+    def _map_file(self, newer_than=None):
+        """Serve rows from the file's pages; only its offset index is built in this worker"""
+        if not os.path.isfile(self.path):
+            return False
+        with open(self.path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        markers, offsets = index_rows(mapped)
+        if newer_than is not None and markers < newer_than.markers:
+            return False
+        # Readers may still hold the old state; its map is released with it
+        self._state = _Rows(markers, offsets, mapped)
+        return True
+
+    def rebuild(self):
+        """Full rebuild from the database, written out before it is served from the file"""
+        self._read_all()
+        state = self._state
+        self._write(state)
+        self._map_file(newer_than=state)
+
+    def _read_all(self):
+        marker_result = self.db.execute_query(MARKER_QUERY, ())
+        rows_result = self.db.execute_query(FULL_QUERY, ())
+        if not (marker_result['success'] and rows_result['success']):
+            raise RuntimeError(marker_result.get('error') or rows_result.get('error'))
+        self._state = _Rows(self._markers_from(marker_result['data'][0]),
+                            {row['property_id']: row for row in rows_result['data']})
+
+    def _write(self, state):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        rows = [state.row(entry) for entry in state.rows.values()]
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_rows(rows, state.markers))
+        # Atomic swap: workers that already mapped the old file keep reading it safely
+        os.replace(tmp_path, self.path)
+
+    def _schedule_write(self):
+        """Persist caught-up rows from a background thread, off the request path"""
+        with self._write_lock:
+            self._write_wanted = True
+            if self._writer is not None and self._writer.is_alive():
+                return
+            self._writer = threading.Thread(target=self._write_pending, name='listing-snapshot-writer', daemon=True)
+            self._writer.start()
+
+    def _write_pending(self):
+        while True:
+            with self._write_lock:
+                if not self._write_wanted:
+                    self._writer = None
+                    return
+                self._write_wanted = False
+            state = self._state
+            try:
+                self._write(state)
+                with self._refresh_lock:
+                    # Switch back to the mapped file unless a newer catch-up replaced the state
+                    if self._state is state:
+                        self._map_file(newer_than=state)
+            except Exception as e:
+                print(f"!!! ERROR writing listing snapshot: {e}")
+
+    @staticmethod
+    def _markers_from(row):
+        return (_epoch(row['property_marker']), _epoch(row['owner_marker']), int(row['review_marker']))
+
+    # ---------- catch-up ----------
+
+    def mark_stale(self):
+        """Catch up on the next read instead of waiting for the refresh interval"""
+        self._checked_at = 0.0
+
+    def refresh(self, force=False):
+        """Apply changes made since the snapshot's marker (at most once per refresh interval)"""
+        if not self.ready:
+            return
+        if not force and time.time() - self._checked_at < self.refresh_interval:
+            return
+        # Never make a request wait on another thread's refresh
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.time()
+            self._catch_up()
+        except Exception as e:
+            print(f"!!! ERROR refreshing listing snapshot: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def _catch_up(self):
+        # Another worker may already have written a newer snapshot
+        if os.path.isfile(self.path):
+            with open(self.path, 'rb') as f:
+                header = HEADER.unpack(f.read(HEADER.size))
+            if tuple(header[2:5]) > self.markers:
+                self._map_file()
+
+        state = self._state
+        marker_result = self.db.execute_query(MARKER_QUERY, ())
+        if not marker_result['success'] or not marker_result['data']:
+            return
+        marker_row = marker_result['data'][0]
+        new_markers = self._markers_from(marker_row)
+        if new_markers == state.markers and marker_row['available'] == len(state.rows) \
+                and not self._marker_is_recent(marker_row):
+            return
+
+        property_marker, owner_marker, review_marker = state.markers
+        changed = self.db.execute_query(
+            CHANGED_IDS_QUERY,
+            (_from_epoch(property_marker), _from_epoch(owner_marker), review_marker)
+        )
+        if not changed['success']:
+            return
+        changed_ids = [row['property_id'] for row in changed['data']]
+
+        rows = dict(state.rows)
+        if changed_ids:
+            placeholders = ','.join(['%s'] * len(changed_ids))
+            fresh = self.db.execute_query(f"""
+                SELECT {LISTING_COLUMNS}
+                FROM PROPERTY p
+                JOIN OWNER o ON p.owner_id = o.owner_id
+                LEFT JOIN (
+                    SELECT property_id, AVG(rating) AS avg_rating
+                    FROM REVIEW
+                    WHERE property_id IN ({placeholders})
+                    GROUP BY property_id
+                ) r ON p.property_id = r.property_id
+                WHERE p.property_id IN ({placeholders})
+            """, tuple(changed_ids) * 2)
+            if not fresh['success']:
+                return
+            for property_id in changed_ids:
+                rows.pop(property_id, None)
+            for row in fresh['data']:
+                if row['status'] == 'Available':
+                    rows[row['property_id']] = row
+
+        # Deleted properties leave no timestamp behind; a count mismatch means a full rebuild
+        if len(rows) != marker_row['available']:
+            self._read_all()
+        else:
+            # Unchanged rows keep pointing into the current map
+            self._state = _Rows(new_markers, rows, state.mapped)
+        self._schedule_write()
+
+    @staticmethod
+    def _marker_is_recent(marker_row):
+        """A second-resolution marker from the current second may hide further writes in it"""
+        latest = max(filter(None, (marker_row['property_marker'], marker_row['owner_marker'])), default=None)
+        return latest is not None and (marker_row['db_now'] - latest).total_seconds() < 2
+
+    # ---------- views ----------
+
+    def home_rows(self):
+        """Rows shaped like home()'s query, cheapest first"""
+        self.refresh()
+        state = self._state
+        if state.home_order is None:
+            state.home_order = state.ordered(lambda row: row['monthly_rent'])
+        return [state.row(entry) for entry in state.home_order]
+
+    def browse_rows(self):
+        """Rows shaped like browse_properties()'s query, by city then rent"""
+        self.refresh()
+        state = self._state
+        if state.browse_order is None:
+            state.browse_order = state.ordered(lambda row: (row['city'] or '', row['monthly_rent']))
+        rows = []
+        for entry in state.browse_order:
+            row = state.row(entry)
+            del row['owner_email']
+            if row['avg_rating'] is None:
+                row['avg_rating'] = Decimal('0.0000')
+            rows.append(row)
+        return rows
+
+
+if __name__ == '__main__':
+    from dotenv import load_dotenv
+    from database import Database
+
+    load_dotenv()
+    database = Database()
+    database.connect()
+    snapshot = ListingSnapshot(database)
+    snapshot.rebuild()
+    print(f"Wrote {len(snapshot._state.rows)} listings to {snapshot.path}")
@@ -0,0 +1,300 @@
+import os
+import random
+import re
+import threading
+import time
+
+from flask import g, request, before_render_template, template_rendered
+from flask.json.provider import DefaultJSONProvider
+
+# Seconds between flushes of this worker's samples to the shared PROFILER_* tables
+PROFILER_FLUSH_INTERVAL = float(os.getenv('PROFILER_FLUSH_INTERVAL', '5'))
+SUMMARY_FIELDS = ('samples', 'wall', 'db_wait', 'python_cpu', 'serialization', 'queries')
+
+
+class ProfilingJSONProvider(DefaultJSONProvider):
+    """JSON provider that reports serialization time to the profiler"""
+
+    def dumps(self, obj, **kwargs):
+        profile = g.get('profile') if g else None
+        if profile is None:
+            return super().dumps(obj, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            profile['serialization'].append(('json', time.perf_counter() - started))
+
+
+class RequestProfiler:
+    """
+    Opt-in sampling profiler for live routes.
+    Sampled requests are split into DB wait, Python time and serialization
+    and aggregated as folded stacks that flame graph tools read directly.
+    When no route is enabled every hook returns on its first line.
+
+    With a store db (its own connection) the sampled routes live in
+    PROFILER_ROUTES, whose changes reach every worker through the change
+    feed, and each worker adds its samples to PROFILER_STACKS /
+    PROFILER_ROUTE_TOTALS every flush_interval, so reports cover all
+    workers. Without one, configuration and samples are per-process.
+    """
+
+    def __init__(self, store_db=None, flush_interval=PROFILER_FLUSH_INTERVAL):
+        self.store_db = store_db
+        self.flush_interval = flush_interval
+        self.sample_rates = {}  # url rule (e.g. '/api/tenant/rentals') -> fraction of requests
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()  # store_db is one connection shared by requests and the flusher
+        self._stacks = {}       # folded stack -> total microseconds not yet flushed
+        self._summary = {}      # url rule -> aggregated seconds not yet flushed
+        self.shared = False     # True once the store is connected
+        self._thread = None
+
+    def init_app(self, app, db, fragment_caches=()):
+        app.json = ProfilingJSONProvider(app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+        db.listeners.append(self._record_query)
+        for cache in fragment_caches:
+            cache.listeners.append(self._record_fragment)
+
+    def start(self):
+        """Connect the store, load the shared configuration and start flushing samples"""
+        if self.store_db is None or self.shared:
+            return
+        if not self.store_db.connect():
+            return
+        self.shared = True
+        self.load_config()
+        if self.flush_interval > 0:
+            self._thread = threading.Thread(target=self._run, name='profiler-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"!!! ERROR flushing profiler samples: {e}")
+
+    def _store(self, query, params=(), fetch=True):
+        with self._store_lock:
+            result = self.store_db.execute_query(query, params, fetch=fetch)
+        if not result['success']:
+            raise RuntimeError(result.get('error'))
+        return result
+
+    # ---------- configuration ----------
+
+    def configure(self, routes, sample_rate):
+        """Enable sampling for the given url rules (a rate of 0 disables them)"""
+        rate = min(max(float(sample_rate), 0.0), 1.0)
+        if self.shared:
+            # Other workers reload on the PROFILER_ROUTES change event
+            for rule in routes:
+                if rate > 0:
+                    self._store(
+                        "INSERT INTO PROFILER_ROUTES (route, sample_rate) VALUES (%s, %s) "
+                        "ON DUPLICATE KEY UPDATE sample_rate = VALUES(sample_rate)",
+                        (rule, rate), fetch=False
+                    )
+                else:
+                    self._store("DELETE FROM PROFILER_ROUTES WHERE route = %s", (rule,), fetch=False)
+            self.load_config()
+            return
+        with self._lock:
+            for rule in routes:
+                if rate > 0:
+                    self.sample_rates[rule] = rate
+                else:
+                    self.sample_rates.pop(rule, None)
+
+    def load_config(self, events=None):
+        """Re-read the shared sample rates (change feed callback for PROFILER_ROUTES)"""
+        result = self._store("SELECT route, sample_rate FROM PROFILER_ROUTES")
+        rates = {row['route']: float(row['sample_rate']) for row in result['data']}
+        with self._lock:
+            self.sample_rates = rates
+
+    def reset(self):
+        """
+        Disable all routes and drop collected samples. Another worker's samples
+        not yet flushed (at most flush_interval old) can still arrive afterwards.
+        """
+        with self._lock:
+            self._stacks = {}
+            self._summary = {}
+        if self.shared:
+            self._store("DELETE FROM PROFILER_ROUTES", fetch=False)
+            self._store("DELETE FROM PROFILER_STACKS", fetch=False)
+            self._store("DELETE FROM PROFILER_ROUTE_TOTALS", fetch=False)
+            self.load_config()
+        else:
+            with self._lock:
+                self.sample_rates = {}
+
+    # ---------- request hooks ----------
+
+    def _start(self):
+        if not self.sample_rates:
+            return
+        rule = request.url_rule.rule if request.url_rule else None
+        rate = self.sample_rates.get(rule)
+        if not rate or random.random() >= rate:
+            return
+        g.profile = {
+            'frame': f"{request.method} {rule}",
+            'rule': rule,
+            'wall_start': time.perf_counter(),
+            'cpu_start': time.thread_time(),
+            'queries': [],
+            'serialization': [],
+            'nested': 0.0,  # query + fragment time so far, excluded from enclosing template renders
+        }
+
+    def _record_query(self, query, params, elapsed):
+        profile = g.get('profile') if g else None
+        if profile is not None:
+            profile['queries'].append((query, elapsed))
+            profile['nested'] += elapsed
+
+    def _record_fragment(self, template_name, elapsed):
+        profile = g.get('profile') if g else None
+        if profile is not None:
+            profile['serialization'].append((f"render {template_name}", elapsed))
+            profile['nested'] += elapsed
+
+    def _render_started(self, sender, template, context, **extra):
+        profile = g.get('profile') if g else None
+        if profile is not None:
+            profile['render_start'] = (time.perf_counter(), profile['nested'])
+
+    def _render_finished(self, sender, template, context, **extra):
+        profile = g.get('profile') if g else None
+        if profile is not None and 'render_start' in profile:
+            started, nested = profile.pop('render_start')
+            # A streamed page runs its queries and card renders while it renders
+            elapsed = time.perf_counter() - started - (profile['nested'] - nested)
+            profile['serialization'].append((f"render {template.name}", max(elapsed, 0.0)))
+
+    def _finish(self, response):
+        profile = g.get('profile') if g else None
+        if profile is None:
+            return response
+        if response.is_streamed:
+            # The body, with its queries and renders, is produced after this hook
+            response.call_on_close(lambda: self._record(profile))
+        else:
+            g.pop('profile')
+            self._record(profile)
+        return response
+
+    def _record(self, profile):
+        wall = time.perf_counter() - profile['wall_start']
+        cpu = time.thread_time() - profile['cpu_start']
+        db_wait = sum(elapsed for _, elapsed in profile['queries'])
+        serialization = sum(elapsed for _, elapsed in profile['serialization'])
+        python = max(wall - db_wait - serialization, 0.0)
+
+        frame = profile['frame']
+        stacks = [(f"{frame};python", python)]
+        stacks += [(f"{frame};db_wait;{_frame_label(query)}", elapsed) for query, elapsed in profile['queries']]
+        stacks += [(f"{frame};serialization;{label}", elapsed) for label, elapsed in profile['serialization']]
+
+        with self._lock:
+            for stack, seconds in stacks:
+                self._stacks[stack] = self._stacks.get(stack, 0) + int(seconds * 1_000_000)
+            totals = self._summary.setdefault(profile['rule'], {
+                'samples': 0, 'wall': 0.0, 'db_wait': 0.0, 'python_cpu': 0.0, 'serialization': 0.0, 'queries': 0
+            })
+            totals['samples'] += 1
+            totals['wall'] += wall
+            totals['db_wait'] += db_wait
+            totals['python_cpu'] += cpu
+            totals['serialization'] += serialization
+            totals['queries'] += len(profile['queries'])
+
+    # ---------- shared store ----------
+
+    def flush(self):
+        """Add this worker's samples to the shared tables and start collecting anew"""
+        if not self.shared:
+            return
+        with self._lock:
+            stacks, self._stacks = self._stacks, {}
+            summary, self._summary = self._summary, {}
+        if stacks:
+            rows = list(stacks.items())
+            self._store(
+                "INSERT INTO PROFILER_STACKS (stack, microseconds) VALUES "
+                + ','.join(['(%s, %s)'] * len(rows))
+                + " ON DUPLICATE KEY UPDATE microseconds = microseconds + VALUES(microseconds)",
+                tuple(value for row in rows for value in row), fetch=False
+            )
+        for rule, totals in summary.items():
+            self._store(
+                f"INSERT INTO PROFILER_ROUTE_TOTALS (route, {', '.join(SUMMARY_FIELDS)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(SUMMARY_FIELDS))}) ON DUPLICATE KEY UPDATE "
+                + ', '.join(f"{field} = {field} + VALUES({field})" for field in SUMMARY_FIELDS),
+                (rule, *(totals[field] for field in SUMMARY_FIELDS)), fetch=False
+            )
+
+    def _totals(self):
+        """url rule -> aggregated seconds, from all workers when shared"""
+        if not self.shared:
+            with self._lock:
+                return {rule: dict(totals) for rule, totals in self._summary.items()}
+        self.flush()
+        result = self._store(f"SELECT route, {', '.join(SUMMARY_FIELDS)} FROM PROFILER_ROUTE_TOTALS")
+        return {row['route']: {field: float(row[field]) for field in SUMMARY_FIELDS} for row in result['data']}
+
+    def _folded(self):
+        """folded stack -> microseconds, from all workers when shared"""
+        if not self.shared:
+            with self._lock:
+                return dict(self._stacks)
+        self.flush()
+        result = self._store("SELECT stack, microseconds FROM PROFILER_STACKS")
+        return {row['stack']: int(row['microseconds']) for row in result['data']}
+
+    # ---------- reports ----------
+
+    def summary(self):
+        """Per-route averages in milliseconds"""
+        totals_by_rule = self._totals()
+        with self._lock:
+            sample_rates = dict(self.sample_rates)
+        report = {}
+        for rule, totals in totals_by_rule.items():
+            samples = totals['samples']
+            if not samples:
+                continue
+            report[rule] = {
+                'samples': int(samples),
+                'sample_rate': sample_rates.get(rule, 0),
+                'avg_wall_ms': round(totals['wall'] * 1000 / samples, 3),
+                'avg_db_wait_ms': round(totals['db_wait'] * 1000 / samples, 3),
+                'avg_python_cpu_ms': round(totals['python_cpu'] * 1000 / samples, 3),
+                'avg_serialization_ms': round(totals['serialization'] * 1000 / samples, 3),
+                'avg_queries': round(totals['queries'] / samples, 2),
+            }
+        return {
+            'sample_rates': sample_rates,
+            'scope': 'all workers' if self.shared else 'this process only',
+            'routes': report
+        }
+
+    def folded_stacks(self):
+        """Collapsed stack output ('frame;frame value' per line, values in microseconds)"""
+        lines = [f"{stack} {value}" for stack, value in sorted(self._folded().items()) if value > 0]
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _frame_label(query):
+    """Single-line SQL label safe to use as a flame graph frame"""
+    label = re.sub(r'\s+', ' ', query).strip().replace(';', '')
+    return label[:80]
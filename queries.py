@@ -0,0 +1,336 @@
+"""
+SQL shared by app.py (Flask) and async_app.py (Quart).
+
+Both serving modes run exactly these statements; only the way they are
+awaited differs. Keep every route's SQL here so the two cannot drift apart.
+"""
+
+# ==================== PUBLIC HOME & AUTH ====================
+
+# Base query joins PROPERTY and OWNER tables
+HOME_LISTINGS = """
+    SELECT
+        p.property_id, p.address, p.city, p.description, p.sq_footage,
+        p.monthly_rent, p.status,
+        o.name as owner_name,
+        o.email as owner_email,
+        o.phone as owner_phone,
+        (SELECT AVG(r.rating) FROM REVIEW r WHERE r.property_id = p.property_id) as avg_rating
+    FROM PROPERTY p
+    JOIN OWNER o ON p.owner_id = o.owner_id
+"""
+
+
+def home_search(form=None):
+    """
+    (query, params) for the home page: the search form's keyword / city
+    filters, or only AVAILABLE properties when there is no form (GET).
+    """
+    query = HOME_LISTINGS
+    params = []
+    conditions = []
+
+    if form is not None:
+        keyword = form.get('keyword', '')
+        city = form.get('city', '')
+
+        if keyword:
+            conditions.append("(p.description LIKE %s OR p.address LIKE %s)")
+            params.extend([f"%{keyword}%", f"%{keyword}%"])
+
+        if city:
+            conditions.append("p.city LIKE %s")
+            params.append(f"%{city}%")
+    else:
+        # Default GET request: Show only AVAILABLE properties
+        conditions.append("p.status = 'Available'")
+
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY p.monthly_rent ASC"
+    return query, tuple(params)
+
+
+def login_lookup(role):
+    """(query, id column) matching an owner or tenant by name and email"""
+    table = 'OWNER' if role == 'owner' else 'TENANT'
+    id_field = 'owner_id' if role == 'owner' else 'tenant_id'
+    return f"SELECT {id_field}, name, email FROM {table} WHERE name = %s AND email = %s", id_field
+
+
+SIGNUP_OWNER = "INSERT INTO OWNER (name, email, phone, bank_details) VALUES (%s, %s, %s, %s)"
+SIGNUP_TENANT = "INSERT INTO TENANT (name, email, phone, id_proof) VALUES (%s, %s, %s, %s)"
+
+# ==================== ADMIN ====================
+
+# Single-row read; GLOBAL_COUNTERS is kept exact by triggers
+ADMIN_STATS = "SELECT total_users, total_properties FROM GLOBAL_COUNTERS WHERE counter_id = 1"
+
+ALL_USERS = """
+    (SELECT owner_id AS id, name, email, phone, 'Owner' AS role FROM OWNER)
+    UNION ALL
+    (SELECT tenant_id AS id, name, email, phone, 'Tenant' AS role FROM TENANT)
+    ORDER BY name
+"""
+
+ALL_APARTMENTS = """
+SELECT
+    p.property_id, p.address, p.city, p.description, p.sq_footage,
+    p.monthly_rent, p.status,
+    o.name AS owner_name, o.email AS owner_email, o.phone AS owner_phone,
+    t.name AS tenant_name
+FROM PROPERTY p
+JOIN OWNER o ON p.owner_id = o.owner_id
+LEFT JOIN OCCUPANCY occ ON p.property_id = occ.property_id AND occ.end_date IS NULL
+LEFT JOIN TENANT t ON occ.tenant_id = t.tenant_id
+ORDER BY p.property_id
+"""
+
+ALL_COMPLAINTS = """
+SELECT
+    r.review_id,
+    r.rating,
+    r.comment,
+    r.review_date,
+    t.name AS tenant_name,
+    p.address AS address
+FROM REVIEW r
+JOIN TENANT t ON r.tenant_id = t.tenant_id
+JOIN PROPERTY p ON r.property_id = p.property_id
+ORDER BY r.review_date DESC
+"""
+
+# Calls the fn_get_avg_rating() SQL function for every row
+RATING_REPORT = """
+SELECT
+    p.property_id,
+    p.address,
+    p.city,
+    o.name AS owner_name,
+    fn_get_avg_rating(p.property_id) AS average_rating
+FROM PROPERTY p
+JOIN OWNER o ON p.owner_id = o.owner_id
+ORDER BY average_rating DESC;
+"""
+
+# ==================== OWNER ====================
+
+OWNER_PROPERTIES = """
+SELECT
+    p.property_id, p.address, p.city, p.description, p.sq_footage,
+    p.monthly_rent, p.status,
+    t.tenant_id, t.name AS tenant_name, t.email AS tenant_email, t.phone AS tenant_phone,
+    occ.occupancy_id, occ.start_date, occ.end_date
+FROM PROPERTY p
+LEFT JOIN OCCUPANCY occ ON p.property_id = occ.property_id AND occ.end_date IS NULL
+LEFT JOIN TENANT t ON occ.tenant_id = t.tenant_id
+WHERE p.owner_id = %s
+ORDER BY p.property_id
+"""
+
+# Single-row read; OWNER_COUNTERS is kept exact by triggers
+OWNER_STATS = """
+    SELECT total_properties, rented_properties, available_properties
+    FROM OWNER_COUNTERS WHERE owner_id = %s
+"""
+
+OWNER_PROPERTY_DETAILS = "SELECT * FROM PROPERTY WHERE property_id = %s AND owner_id = %s"
+
+CREATE_PROPERTY = """
+INSERT INTO PROPERTY (owner_id, address, city, description, sq_footage, monthly_rent, status)
+VALUES (%s, %s, %s, %s, %s, %s, 'Available')
+"""
+
+PROPERTY_OWNER = "SELECT owner_id FROM PROPERTY WHERE property_id = %s"
+
+UPDATE_PROPERTY = """
+UPDATE PROPERTY
+SET address = %s, city = %s, description = %s,
+    sq_footage = %s, monthly_rent = %s, status = %s
+WHERE property_id = %s
+"""
+
+# Child records of a property, deleted before the property itself
+PROPERTY_OCCUPANCY_IDS = "SELECT occupancy_id FROM OCCUPANCY WHERE property_id = %s"
+DELETE_PROPERTY_REVIEWS = "DELETE FROM REVIEW WHERE property_id = %s"
+DELETE_PROPERTY_OCCUPANCIES = "DELETE FROM OCCUPANCY WHERE property_id = %s"
+DELETE_PROPERTY = "DELETE FROM PROPERTY WHERE property_id = %s"
+
+
+def delete_payments(occupancy_ids):
+    """DELETE for the payments of these (integer) occupancy ids"""
+    occ_id_list = ','.join(map(str, occupancy_ids))
+    return f"DELETE FROM PAYMENTS WHERE occupancy_id IN ({occ_id_list})"
+
+
+ALL_TENANTS = "SELECT tenant_id, name, email FROM TENANT ORDER BY name"
+
+PROPERTY_OWNER_STATUS = "SELECT owner_id, status FROM PROPERTY WHERE property_id = %s"
+
+# Same-day re-assignment check
+SAME_DAY_ASSIGNMENT = """
+    SELECT occupancy_id FROM OCCUPANCY
+    WHERE tenant_id = %s AND property_id = %s AND start_date = CURDATE()
+"""
+
+ASSIGN_TENANT = """
+    INSERT INTO OCCUPANCY (tenant_id, property_id, start_date)
+    VALUES (%s, %s, CURDATE())
+"""
+
+OCCUPANCY_OWNER = """
+    SELECT p.owner_id, o.property_id
+    FROM OCCUPANCY o
+    JOIN PROPERTY p ON o.property_id = p.property_id
+    WHERE o.occupancy_id = %s
+"""
+
+CHECKOUT_TENANT = "CALL sp_checkout_tenant(%s, CURDATE())"
+
+OWNER_PAYMENTS = """
+SELECT
+    pay.payment_id,
+    pay.amount,
+    pay.payment_date,
+    pay.month_year,
+    pay.method,
+    pay.status,
+    t.name AS tenant_name,
+    p.address AS property_address
+FROM PAYMENTS pay
+JOIN OCCUPANCY occ ON pay.occupancy_id = occ.occupancy_id
+JOIN PROPERTY p ON occ.property_id = p.property_id
+JOIN TENANT t ON occ.tenant_id = t.tenant_id
+WHERE
+    p.owner_id = %s
+    AND pay.month_year = %s
+ORDER BY pay.payment_date DESC
+"""
+
+# ==================== TENANT ====================
+
+TENANT_RENTALS = """
+SELECT
+    p.property_id, p.address, p.city, p.description, p.sq_footage,
+    p.monthly_rent, p.status,
+    o.name AS owner_name, o.phone AS owner_phone,
+    occ.occupancy_id, occ.start_date, occ.end_date
+FROM OCCUPANCY occ
+JOIN PROPERTY p ON occ.property_id = p.property_id
+JOIN OWNER o ON p.owner_id = o.owner_id
+WHERE occ.tenant_id = %s
+ORDER BY occ.start_date DESC
+"""
+
+# ALL payments for a tenant in ONE query
+TENANT_RENTAL_PAYMENTS = """
+    SELECT p.payment_id, p.amount, p.payment_date, p.month_year, p.method, p.status, p.occupancy_id
+    FROM PAYMENTS p
+    JOIN OCCUPANCY o ON p.occupancy_id = o.occupancy_id
+    WHERE o.tenant_id = %s
+"""
+
+# balance = rent for every month from start to end (or this month) minus rent paid
+TENANT_LEDGER = """
+SELECT
+    p.property_id, p.address, p.city, p.description, p.sq_footage,
+    p.monthly_rent, p.status,
+    o.name AS owner_name, o.phone AS owner_phone,
+    occ.occupancy_id, occ.start_date, occ.end_date,
+    COALESCE(pay.total_paid, 0) AS total_paid,
+    pay.last_payment_date,
+    COALESCE(pay.late_count, 0) AS late_count,
+    (occ.end_date IS NULL AND COALESCE(pay.current_month_settled, 0) = 0) AS rent_due,
+    (PERIOD_DIFF(DATE_FORMAT(COALESCE(occ.end_date, CURDATE()), '%%Y%%m'),
+                 DATE_FORMAT(occ.start_date, '%%Y%%m')) + 1) * p.monthly_rent
+        - COALESCE(pay.total_paid, 0) AS balance
+FROM OCCUPANCY occ
+JOIN PROPERTY p ON occ.property_id = p.property_id
+JOIN OWNER o ON p.owner_id = o.owner_id
+LEFT JOIN (
+    SELECT
+        pm.occupancy_id,
+        SUM(CASE WHEN pm.status = 'Paid' THEN pm.amount ELSE 0 END) AS total_paid,
+        MAX(pm.payment_date) AS last_payment_date,
+        SUM(pm.status = 'Late') AS late_count,
+        MAX(pm.month_year = %s AND pm.status IN ('Paid', 'Pending')) AS current_month_settled
+    FROM PAYMENTS pm
+    JOIN OCCUPANCY o2 ON pm.occupancy_id = o2.occupancy_id
+    WHERE o2.tenant_id = %s
+    GROUP BY pm.occupancy_id
+) pay ON pay.occupancy_id = occ.occupancy_id
+WHERE occ.tenant_id = %s
+ORDER BY occ.start_date DESC
+"""
+
+
+def tenant_payments(tenant_id, date_from, date_to, occupancy_id, page, per_page):
+    """(query, params) for one page of a tenant's payment history"""
+    query = """
+    SELECT p.payment_id, p.amount, p.payment_date, p.month_year, p.method, p.status, p.occupancy_id
+    FROM PAYMENTS p
+    JOIN OCCUPANCY o ON p.occupancy_id = o.occupancy_id
+    WHERE o.tenant_id = %s AND p.payment_date BETWEEN %s AND %s
+    """
+    params = [tenant_id, date_from, date_to]
+    if occupancy_id is not None:
+        query += " AND p.occupancy_id = %s"
+        params.append(occupancy_id)
+    # One extra row tells us whether another page exists
+    query += " ORDER BY p.payment_date DESC, p.payment_id DESC LIMIT %s OFFSET %s"
+    params.extend([per_page + 1, (page - 1) * per_page])
+    return query, tuple(params)
+
+
+OCCUPANCY_TENANT = "SELECT tenant_id FROM OCCUPANCY WHERE occupancy_id = %s"
+
+MAKE_PAYMENT = """
+    INSERT INTO PAYMENTS (occupancy_id, amount, payment_date, month_year, method, status)
+    VALUES (%s, %s, CURDATE(), %s, %s, 'Paid')
+"""
+
+SUBMIT_REVIEW = """
+INSERT INTO REVIEW (tenant_id, property_id, rating, comment, review_date)
+VALUES (%s, %s, %s, %s, CURDATE())
+"""
+
+PROPERTY_STATUS = "SELECT status FROM PROPERTY WHERE property_id = %s"
+
+REQUEST_RENT = """
+INSERT INTO OCCUPANCY (tenant_id, property_id, start_date, end_date)
+VALUES (%s, %s, CURDATE(), NULL)
+"""
+
+# ==================== BROWSE & AVAILABILITY ====================
+
+# Joins a subquery for avg_rating instead of a nested query per row
+BROWSE_PROPERTIES = """
+SELECT
+    p.property_id, p.address, p.city, p.description, p.sq_footage,
+    p.monthly_rent, p.status,
+    o.name AS owner_name,
+    o.phone AS owner_phone,
+    COALESCE(r.avg_rating, 0) AS avg_rating
+FROM PROPERTY p
+JOIN OWNER o ON p.owner_id = o.owner_id
+LEFT JOIN (
+    SELECT property_id, AVG(rating) as avg_rating
+    FROM REVIEW
+    GROUP BY property_id
+) r ON p.property_id = r.property_id
+WHERE p.status = 'Available'
+ORDER BY p.city, p.monthly_rent
+"""
+
+# Every rentable property; the occupancy check runs against the interval index
+RENTABLE_PROPERTIES = """
+SELECT
+    p.property_id, p.address, p.city, p.description, p.sq_footage,
+    p.monthly_rent, p.status,
+    o.name AS owner_name,
+    o.phone AS owner_phone
+FROM PROPERTY p
+JOIN OWNER o ON p.owner_id = o.owner_id
+WHERE p.status <> 'Maintenance'
+ORDER BY p.city, p.monthly_rent
+"""
@@ -0,0 +1,150 @@
+"""
+Request-argument parsing and JSON shaping shared by app.py and async_app.py.
+
+Helpers take plain dicts / MultiDicts and return plain dicts; each app
+passes them its own request.args and jsonifies the result.
+"""
+from datetime import date, datetime, timedelta
+
+DATE_RANGE_ERROR = 'from / to must be YYYY-MM-DD dates, to not before from'
+PAYMENT_DATES_ERROR = 'Dates must be in YYYY-MM-DD format'
+DUPLICATE_REVIEW_ERROR = 'You have already reviewed this property'
+PROPERTY_ID_ERROR = 'property_id must be a whole number'
+
+
+def _date_arg(args, name):
+    """YYYY-MM-DD query arg as a date, None when absent; raises ValueError"""
+    return datetime.strptime(args[name], '%Y-%m-%d').date() if args.get(name) else None
+
+
+def id_field(data, name):
+    """Whole-number id from request JSON (303 or "303"), None when missing or invalid"""
+    value = (data or {}).get(name)
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def counter_stats(result, fields):
+    """Dashboard stats from a single counters row (missing row or NULL -> 0)"""
+    if not result['success']:
+        return result
+    row = result['data'][0] if result['data'] else {}
+    return {'success': True, 'data': {field: row.get(field) or 0 for field in fields}}
+
+
+def with_message(result, message):
+    """Attach a success message to a write's result dict"""
+    if result['success']:
+        result['message'] = message
+    return result
+
+
+def attach_payments(rentals, payment_result):
+    """Give every rental its payments and rent_due flag, combined in Python (no nested queries)"""
+    payments_map = {}
+    if payment_result['success'] and payment_result['data']:
+        for payment in payment_result['data']:
+            payments_map.setdefault(payment['occupancy_id'], []).append(payment)
+
+    current_month = datetime.now().strftime('%Y-%m')
+    for rental in rentals:
+        rental['payments'] = payments_map.get(rental['occupancy_id'], [])
+        # Rent is due on a running tenancy unless this month is paid or pending
+        rental['rent_due'] = rental['end_date'] is None and not any(
+            payment['month_year'] == current_month and payment['status'] in ['Paid', 'Pending']
+            for payment in rental['payments']
+        )
+    return rentals
+
+
+def ledger_rows(result):
+    """MySQL returns the ledger's flags and counts as integers / decimals"""
+    if result['success']:
+        for row in result['data']:
+            row['rent_due'] = bool(row['rent_due'])
+            row['late_count'] = int(row['late_count'])
+    return result
+
+
+def payment_window(args):
+    """(date_from, date_to) of a payment history request, default the last 12 months; raises ValueError"""
+    date_to = _date_arg(args, 'to') or datetime.now().date()
+    # Clamped so that a 'to' early in year 1 does not overflow
+    date_from = _date_arg(args, 'from') or date_to - min(timedelta(days=365), date_to - date.min)
+    return date_from, date_to
+
+
+def paging(args):
+    """(page, per_page, occupancy_id) of a payment history request"""
+    page = max(args.get('page', 1, type=int), 1)
+    per_page = min(max(args.get('per_page', 20, type=int), 1), 100)
+    return page, per_page, args.get('occupancy_id', type=int)
+
+
+def payments_page(result, page, per_page, date_from, date_to):
+    """One page of payments; the query fetched one extra row to tell whether more follow"""
+    if not result['success']:
+        return result
+    rows = result['data']
+    return {
+        'success': True,
+        'data': rows[:per_page],
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(rows) > per_page,
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'messages': []
+    }
+
+
+def review_result(result):
+    """Turn the duplicate-review trigger's error into a readable message"""
+    if result['success']:
+        result['message'] = 'Review submitted successfully'
+    elif result.get('error'):
+        if 'trg_prevent_duplicate_review' in result['error']:
+            result['message'] = DUPLICATE_REVIEW_ERROR
+        result['error'] = DUPLICATE_REVIEW_ERROR
+    return result
+
+
+def date_range(args, default_days):
+    """(first_day, last_day) from the from / to query args (YYYY-MM-DD); raises ValueError"""
+    first_day = _date_arg(args, 'from') or datetime.now().date()
+    # Clamped so that a 'from' late in year 9999 does not overflow
+    last_day = _date_arg(args, 'to') or first_day + min(timedelta(days=default_days), date.max - first_day)
+    if last_day < first_day:
+        raise ValueError('to must not be before from')
+    return first_day, last_day
+
+
+def available_listing(rows, free_ids, first_day, last_day):
+    """Rentable properties that the availability index reported free"""
+    free_ids = set(free_ids)
+    return {
+        'success': True,
+        'data': [row for row in rows if row['property_id'] in free_ids],
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat(),
+        'messages': []
+    }
+
+
+def property_calendar(property_id, status, calendar, first_day, last_day):
+    return {
+        'success': True,
+        'data': {
+            'property_id': property_id,
+            'status': status,
+            'calendar': calendar
+        },
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat(),
+        'messages': []
+    }
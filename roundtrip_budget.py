@@ -0,0 +1,392 @@
+"""
+Per-route database round-trip budget check.
+
+Seeds a scratch database from the project's SQL scripts, drives every route
+of app.py through the Flask test client and counts the statements each one
+sends through any of the app's Database connections (SHOW WARNINGS after
+writes, the change-feed poll after writes and listing snapshot catch-ups
+included). The counts are
+compared with roundtrip_budget.json: a route fails when it needs more round
+trips than its budget, when it repeats the same statement (an N+1
+pattern) or when any of its statements fails (including streamed ones,
+whose errors never reach the HTTP status). Every finding lists the SQL
+involved.
+
+    python roundtrip_budget.py            # check; exit status 1 on findings
+    python roundtrip_budget.py --update   # rewrite the budget from the current counts
+
+Until the budget file has been written by --update ("measured": true) the
+check fails, so hand-edited numbers are never mistaken for measurements.
+
+The scratch database (ROUNDTRIP_DB_NAME, default rental_db_roundtrip) is
+dropped and re-created before every scenario, so it must not be the real one.
+DB_HOST / DB_USER / DB_PASSWORD come from the environment or .env as usual.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from collections import Counter
+
+import mysql.connector
+from dotenv import load_dotenv
+
+from database import Database
+
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_PATH = os.path.join(BASE_DIR, 'roundtrip_budget.json')
+SCRATCH_DB = os.getenv('ROUNDTRIP_DB_NAME', 'rental_db_roundtrip')
+
+# Same order as the README setup steps
+SEED_SCRIPTS = (
+    'DBMS_PropertyRental_MiniProject_DDL_Commands.sql',
+    'DBMS_PropertyRental_MiniProject_DML_Commands.sql',
+    'DBMS_PropertyRental_MiniProject_Trigger_Procedure_Function.sql',
+)
+
+# Statements that legitimately repeat within one request
+IGNORED_REPEATS = ('show warnings',)
+
+# Session contents per role, matching the seeded DML rows
+SESSIONS = {
+    'admin': {'role': 'admin', 'user_id': 0, 'user_name': 'Administrator'},
+    'owner': {'role': 'owner', 'user_id': 101, 'user_name': 'Anil Sharma',
+              'user_email': 'anil.sharma@example.com'},
+    'owner_102': {'role': 'owner', 'user_id': 102, 'user_name': 'Bhavna Kulkarni',
+                  'user_email': 'bhavna.k@example.com'},
+    'tenant': {'role': 'tenant', 'user_id': 201, 'user_name': 'Devika Patel',
+               'user_email': 'devika.p@example.com'},
+    'tenant_203': {'role': 'tenant', 'user_id': 203, 'user_name': 'Farah Ali',
+                   'user_email': 'farah.a@example.com'},
+    'tenant_204': {'role': 'tenant', 'user_id': 204, 'user_name': 'Gaurav Singh',
+                   'user_email': 'gaurav.s@example.com'},
+}
+
+# (method, path, session, request kwargs); each runs against a freshly seeded database
+SCENARIOS = [
+    ('GET', '/', None, {}),
+    ('POST', '/', None, {'data': {'keyword': 'BHK', 'city': ''}}),
+    ('GET', '/login', None, {}),
+    ('GET', '/login-form/owner', None, {}),
+    ('POST', '/api/login', None, {'json': {'role': 'owner', 'name': 'Anil Sharma',
+                                           'email': 'anil.sharma@example.com'}}),
+    ('GET', '/signup', None, {}),
+    ('POST', '/api/signup', None, {'json': {'role': 'tenant', 'name': 'Harsh Mehta',
+                                            'email': 'harsh.m@example.com', 'phone': '9123456780',
+                                            'id_proof': 'PAN Card'}}),
+    ('GET', '/logout', 'tenant', {}),
+
+    ('GET', '/admin', 'admin', {}),
+    ('GET', '/api/admin/stats', 'admin', {}),
+    ('GET', '/api/admin/all_users', 'admin', {}),
+    ('GET', '/api/admin/all_apartments', 'admin', {}),
+    ('GET', '/api/admin/all_complaints', 'admin', {}),
+    ('GET', '/api/admin/rating_report', 'admin', {}),
+    ('GET', '/api/admin/analytics', 'admin', {}),
+    ('GET', '/api/admin/query_coalescing', 'admin', {}),
+    ('DELETE', '/api/admin/query_coalescing', 'admin', {}),
+    ('GET', '/api/admin/profiler', 'admin', {}),
+    ('POST', '/api/admin/profiler', 'admin', {'json': {'routes': [], 'sample_rate': 0}}),
+    ('DELETE', '/api/admin/profiler', 'admin', {}),
+    ('GET', '/api/admin/profiler/flamegraph', 'admin', {}),
+
+    ('GET', '/owner', 'owner', {}),
+    ('GET', '/api/owner/properties', 'owner', {}),
+    ('GET', '/api/owner/stats', 'owner', {}),
+    ('GET', '/api/owner/analytics', 'owner', {}),
+    ('GET', '/api/owner/property/301', 'owner', {}),
+    ('POST', '/api/owner/property', 'owner', {'json': {'address': '7C, Hill Crest', 'city': 'Bengaluru',
+                                                       'description': '1BHK near park', 'sq_footage': 650,
+                                                       'monthly_rent': 16000}}),
+    ('PUT', '/api/owner/property/301', 'owner', {'json': {'address': '1A, Green Heights Apts',
+                                                          'city': 'Bengaluru', 'description': '2BHK with balcony',
+                                                          'sq_footage': 1200, 'monthly_rent': 26000,
+                                                          'status': 'Rented'}}),
+    ('DELETE', '/api/owner/property/301', 'owner', {}),
+    ('GET', '/api/owner/all_tenants', 'owner', {}),
+    ('POST', '/api/owner/assign_tenant', 'owner_102', {'json': {'property_id': 303, 'tenant_id': 204}}),
+    ('POST', '/api/owner/end_tenancy', 'owner', {'json': {'occupancy_id': 1}}),
+    ('GET', '/api/owner/payments?month=2025-10', 'owner', {}),
+
+    ('GET', '/tenant', 'tenant', {}),
+    ('GET', '/api/tenant/rentals', 'tenant', {}),
+    ('GET', '/api/tenant/ledger', 'tenant', {}),
+    ('GET', '/api/tenant/payments?from=2025-01-01&to=2025-12-31', 'tenant', {}),
+    ('POST', '/api/tenant/make_payment', 'tenant', {'json': {'occupancy_id': 1, 'amount': 25000,
+                                                             'month_year': '2025-11', 'method': 'UPI'}}),
+    ('POST', '/api/tenant/review', 'tenant_203', {'json': {'property_id': 304, 'rating': 4,
+                                                           'comment': 'Responsive owner.'}}),
+    ('POST', '/api/tenant/request-rent', 'tenant_204', {'json': {'property_id': 305}}),
+
+    ('GET', '/api/properties/browse', None, {}),
+    ('GET', '/api/properties/available?from=2025-12-01&to=2026-02-28', None, {}),
+    ('GET', '/api/properties/302/calendar?from=2025-01-01&to=2025-06-30', None, {}),
+    ('GET', '/assets/css/style.css', None, {}),
+]
+
+
+# ---------- seeding ----------
+
+def _strip_comment(line):
+    """Drop a trailing `-- comment` that is not inside a string literal"""
+    in_quote = False
+    for i, char in enumerate(line):
+        if char == "'":
+            in_quote = not in_quote
+        elif not in_quote and line.startswith('--', i) and line[i + 2:i + 3] in ('', ' ', '\t', '\n'):
+            return line[:i]
+    return line
+
+
+def split_sql(script):
+    """Split a mysql-client script into statements, honouring DELIMITER lines"""
+    delimiter = ';'
+    statements = []
+    buffer = []
+    for raw_line in script.splitlines():
+        line = _strip_comment(raw_line).rstrip()
+        if line.strip().upper().startswith('DELIMITER '):
+            delimiter = line.split()[1]
+            continue
+        if not line.strip():
+            continue
+        buffer.append(line)
+        if line.endswith(delimiter):
+            buffer[-1] = line[:-len(delimiter)]
+            statement = '\n'.join(buffer).strip()
+            if statement:
+                statements.append(statement)
+            buffer = []
+    if '\n'.join(buffer).strip():
+        statements.append('\n'.join(buffer).strip())
+    return statements
+
+
+def seed_database():
+    """Drop and re-create the scratch database from the SQL scripts"""
+    connection = mysql.connector.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', 'password'),
+        autocommit=True
+    )
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{SCRATCH_DB}`")
+        cursor.execute(f"CREATE DATABASE `{SCRATCH_DB}`")
+        cursor.execute(f"USE `{SCRATCH_DB}`")
+        for script_name in SEED_SCRIPTS:
+            with open(os.path.join(BASE_DIR, script_name), encoding='utf-8') as f:
+                for statement in split_sql(f.read()):
+                    cursor.execute(statement)
+                    # Drain result sets so the next statement can run
+                    if cursor.with_rows:
+                        cursor.fetchall()
+        cursor.callproc('sp_rebuild_counters')
+    finally:
+        cursor.close()
+        connection.close()
+
+
+# ---------- measuring ----------
+
+def load_app():
+    """
+    Import app.py against the scratch database. The listing snapshot (in a
+    scratch file) and the change feed stay on, so snapshot reads and the
+    outbox poll after every write are counted; their timers are set out of
+    reach so that only requests trigger them while a scenario runs.
+    """
+    os.environ['DB_NAME'] = SCRATCH_DB
+    os.environ['LISTING_SNAPSHOT_PATH'] = os.path.join(tempfile.mkdtemp(prefix='roundtrip_'), 'listings.bin')
+    os.environ['LISTING_SNAPSHOT_REFRESH'] = '86400'
+    os.environ['CHANGE_FEED_INTERVAL'] = '86400'
+    os.environ['PROFILER_FLUSH_INTERVAL'] = '86400'
+    seed_database()
+    import app as app_module
+    return app_module
+
+
+def app_databases(app_module):
+    """Every Database the app created: module globals and the connections its components hold"""
+    found = {}
+    for value in vars(app_module).values():
+        candidates = [value]
+        # Only this project's objects (ChangeFeed, SingleFlight, ...); framework proxies are skipped
+        module = sys.modules.get(type(value).__module__)
+        if os.path.dirname(os.path.abspath(getattr(module, '__file__', None) or '/')) == BASE_DIR:
+            candidates += vars(value).values() if hasattr(value, '__dict__') else []
+        for candidate in candidates:
+            if isinstance(candidate, Database):
+                found[id(candidate)] = candidate
+    return list(found.values())
+
+
+def reset_app(app_module):
+    """Fresh data, fresh connections and empty in-process caches for the next scenario"""
+    # DROP DATABASE leaves open connections without a default database, so
+    # every connection the app holds (stream pools included) is re-opened
+    databases = app_databases(app_module)
+    for database in databases:
+        database.disconnect()
+    seed_database()
+    for database in databases:
+        database.connect()
+    app_module.listing_cards.clear()
+    app_module.portfolio_analytics.clear()
+    app_module.report_queries.clear()
+    app_module.availability.clear()
+    # Started after seeding, like at app startup: a fresh snapshot file and the outbox read from its end
+    if os.path.isfile(app_module.listing_snapshot.path):
+        os.remove(app_module.listing_snapshot.path)
+    app_module.listing_snapshot.load()
+    app_module.change_feed.skip_to_end()
+    app_module.profiler.reset()
+
+
+def normalize_sql(query):
+    """Statement shape: literals and IN lists folded so repeats compare equal"""
+    shape = re.sub(r'\s+', ' ', query).strip().rstrip(';').lower()
+    shape = re.sub(r"'(?:[^'\\]|\\.)*'", '?', shape)
+    shape = re.sub(r'\b\d+\b', '?', shape)
+    shape = re.sub(r'in \((?:\?|%s)(?:, ?(?:\?|%s))*\)', 'in (?)', shape)
+    return shape
+
+
+def route_key(app, method, path):
+    adapter = app.url_map.bind('localhost')
+    rule, _ = adapter.match(path.split('?')[0], method=method, return_rule=True)
+    return f"{method} {rule.rule}"
+
+
+def measure(app_module):
+    """Run every scenario; returns {route key: (status code, [statements], [(statement, error)])}"""
+    app = app_module.app
+    statements = []
+    errors = []
+    for database in app_databases(app_module):
+        database.listeners.append(lambda query, params, elapsed: statements.append(query))
+        database.error_listeners.append(lambda query, params, error: errors.append((query, str(error))))
+
+    measured = {}
+    for method, path, session_name, kwargs in SCENARIOS:
+        reset_app(app_module)
+        client = app.test_client()
+        if session_name:
+            with client.session_transaction() as sess:
+                sess.update(SESSIONS[session_name])
+        statements.clear()
+        errors.clear()
+        response = client.open(path, method=method, **kwargs)
+        # Streamed pages only run their queries while the body is read
+        response.get_data()
+        response.close()
+        measured[route_key(app, method, path)] = (response.status_code, list(statements), list(errors))
+    return measured
+
+
+def all_route_keys(app):
+    keys = set()
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        for method in rule.methods - {'HEAD', 'OPTIONS'}:
+            keys.add(f"{method} {rule.rule}")
+    return keys
+
+
+# ---------- checking ----------
+
+def _format_sql(queries):
+    lines = []
+    for number, query in enumerate(queries, 1):
+        one_line = re.sub(r'\s+', ' ', query).strip()
+        lines.append(f"      {number:>2}. {one_line}")
+    return '\n'.join(lines)
+
+
+def check(measured, budget, route_keys):
+    """Findings as (route key, message, offending statements)"""
+    findings = []
+    routes = budget.get('routes', {})
+    max_repeats = budget.get('max_repeats', 1)
+
+    if not budget.get('measured'):
+        findings.append(('roundtrip_budget.json', 'budgets were not measured; run with --update '
+                                                  'against a seeded database and commit the result', []))
+
+    for key in sorted(route_keys - measured.keys()):
+        findings.append((key, 'route is not exercised by any scenario in roundtrip_budget.py', []))
+
+    for key, (status, queries, errors) in sorted(measured.items()):
+        if status >= 500:
+            findings.append((key, f"request failed with HTTP {status}", queries))
+            continue
+        for query, error in errors:
+            findings.append((key, f"statement failed: {error}", [query]))
+
+        allowed = routes.get(key)
+        if allowed is None:
+            findings.append((key, f"no budget entry ({len(queries)} statements); run with --update", queries))
+        elif len(queries) > allowed:
+            findings.append((key, f"{len(queries)} statements, budget is {allowed}", queries))
+
+        shapes = Counter(normalize_sql(query) for query in queries)
+        for shape, count in shapes.items():
+            if count > max_repeats and shape not in IGNORED_REPEATS:
+                repeated = [query for query in queries if normalize_sql(query) == shape]
+                findings.append((key, f"same statement issued {count} times (N+1?)", repeated[:1]))
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--update', action='store_true', help='rewrite the budget file from the current counts')
+    args = parser.parse_args()
+
+    app_module = load_app()
+    measured = measure(app_module)
+
+    with open(BUDGET_PATH, encoding='utf-8') as f:
+        budget = json.load(f)
+
+    if args.update:
+        failed = sorted(key for key, (status, queries, errors) in measured.items() if status >= 500 or errors)
+        if failed:
+            print(f"Not updating: {len(failed)} route(s) failed: {', '.join(failed)}")
+            return 1
+        budget['measured'] = True
+        budget['routes'] = {key: len(queries) for key, (status, queries, errors) in sorted(measured.items())}
+        with open(BUDGET_PATH, 'w', encoding='utf-8') as f:
+            json.dump(budget, f, indent=2)
+            f.write('\n')
+        print(f"Wrote {len(budget['routes'])} route budgets to {BUDGET_PATH}")
+        return 0
+
+    findings = check(measured, budget, all_route_keys(app_module.app))
+    for key, (status, queries, errors) in sorted(measured.items()):
+        allowed = budget.get('routes', {}).get(key, '-')
+        print(f"  {len(queries):>3} / {allowed:<3} {key}")
+
+    stale = sorted(budget.get('routes', {}).keys() - measured.keys())
+    for key in stale:
+        print(f"Note: budget entry for {key} matches no scenario")
+
+    if not findings:
+        print(f"OK: {len(measured)} routes within their round-trip budgets")
+        return 0
+
+    print(f"\n{len(findings)} finding(s):")
+    for key, message, queries in findings:
+        print(f"\n  {key}: {message}")
+        if queries:
+            print(_format_sql(queries))
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
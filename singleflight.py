@@ -0,0 +1,213 @@
+"""
+Single-flight coalescing for expensive read queries.
+
+Concurrent callers asking for the same (query, params) share one execution:
+the first caller runs it, the others wait for its result instead of sending
+their own copy to MySQL. A result can additionally be kept for a short TTL,
+and past that for a stale window during which it is still served while one
+background execution refreshes it, so callers never wait on a refresh.
+A blocking connection is not safe to share between threads, so SingleFlight
+only refreshes in the background when given a connection of its own
+(refresh_db); without one the first caller past the TTL refreshes inline.
+
+Results are shared between callers and must be treated as read-only.
+"""
+import asyncio
+import os
+import threading
+import time
+
+# Seconds a result is served as fresh (0 only coalesces concurrent calls)
+SINGLEFLIGHT_TTL = float(os.getenv('SINGLEFLIGHT_TTL', '2'))
+# Further seconds an expired result is served while it refreshes in the background
+SINGLEFLIGHT_STALE = float(os.getenv('SINGLEFLIGHT_STALE', '30'))
+
+
+class _Call:
+    """One in-flight execution that followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class _Coalescer:
+    """Bookkeeping shared by the blocking and asyncio variants"""
+
+    def __init__(self, db, ttl, stale_ttl):
+        self.db = db
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._results = {}    # key -> (stored_at, result)
+        self._in_flight = {}  # key -> call
+        self._generation = 0  # bumped by clear(); results started before it are not stored
+        self._lock = threading.Lock()
+        self.executions = 0   # statements actually sent to the database
+        self.coalesced = 0    # callers that joined another caller's execution
+        self.hits = 0         # callers served a fresh stored result
+        self.stale = 0        # callers served an expired result during its refresh
+
+    @staticmethod
+    def _key(query, params):
+        return (query, tuple(params or ()))
+
+    def _cached(self, key, now, background=True):
+        """
+        (result, needs_refresh) for a stored result still inside its TTL or stale window.
+        Without background refreshes a stale result is only served while another
+        caller is already refreshing it.
+        """
+        entry = self._results.get(key)
+        if entry is None:
+            return None, False
+        age = now - entry[0]
+        if age < self.ttl:
+            self.hits += 1
+            return entry[1], False
+        if age < self.ttl + self.stale_ttl:
+            if not background and key not in self._in_flight:
+                return None, False
+            self.stale += 1
+            return entry[1], key not in self._in_flight
+        del self._results[key]
+        return None, False
+
+    def _finish(self, key, call, result, generation):
+        with self._lock:
+            if self._in_flight.get(key) is call:
+                del self._in_flight[key]
+            keep = self.ttl > 0 or self.stale_ttl > 0
+            if keep and result.get('success') and generation == self._generation:
+                self._results[key] = (time.monotonic(), result)
+
+    def clear(self):
+        """Forget every stored result; executions already running are not stored"""
+        with self._lock:
+            self._generation += 1
+            self._results.clear()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'hits': self.hits,
+                'stale': self.stale,
+                'saved': self.coalesced + self.hits + self.stale,
+                'stored_results': len(self._results),
+                'in_flight': len(self._in_flight),
+                'ttl': self.ttl,
+                'stale_ttl': self.stale_ttl
+            }
+
+
+class SingleFlight(_Coalescer):
+    """Coalescing wrapper around Database.execute_query for threaded servers"""
+
+    def __init__(self, db, ttl=SINGLEFLIGHT_TTL, stale_ttl=SINGLEFLIGHT_STALE, refresh_db=None):
+        super().__init__(db, ttl, stale_ttl)
+        self.refresh_db = refresh_db      # connection used only by background refreshes
+        self._refresh_lock = threading.Lock()
+
+    def execute_query(self, query, params=None):
+        """Same result dict as Database.execute_query(query, params) (reads only)"""
+        key = self._key(query, params)
+        with self._lock:
+            result, needs_refresh = self._cached(key, time.monotonic(), background=self.refresh_db is not None)
+            if result is not None:
+                if needs_refresh:
+                    call, generation = self._lead(key)
+                    threading.Thread(
+                        target=self._refresh, args=(key, call, generation, query, params),
+                        name='singleflight-refresh', daemon=True
+                    ).start()
+                return result
+
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call, generation = self._lead(key)
+                leader = True
+
+        if leader:
+            self._execute(key, call, generation, query, params)
+        else:
+            call.done.wait()
+        return call.result
+
+    def _lead(self, key):
+        call = _Call()
+        self._in_flight[key] = call
+        self.executions += 1
+        return call, self._generation
+
+    def _refresh(self, key, call, generation, query, params):
+        # One refresh at a time on the refresh connection
+        with self._refresh_lock:
+            self._execute(key, call, generation, query, params, db=self.refresh_db)
+
+    def _execute(self, key, call, generation, query, params, db=None):
+        try:
+            result = (db or self.db).execute_query(query, params)
+        except Exception as e:
+            print(f"!!! ERROR in single-flight query: {e}")
+            result = {'success': False, 'error': str(e), 'messages': []}
+        self._finish(key, call, result, generation)
+        call.result = result
+        call.done.set()
+
+
+class AsyncSingleFlight(_Coalescer):
+    """Coalescing wrapper around AsyncDatabase.execute_query for the asyncio app"""
+
+    def __init__(self, db, ttl=SINGLEFLIGHT_TTL, stale_ttl=SINGLEFLIGHT_STALE):
+        super().__init__(db, ttl, stale_ttl)
+        self._tasks = set()  # keeps shared executions and background refreshes referenced
+
+    async def execute_query(self, query, params=None):
+        """Same result dict as AsyncDatabase.execute_query(query, params) (reads only)"""
+        key = self._key(query, params)
+        with self._lock:
+            result, needs_refresh = self._cached(key, time.monotonic())
+            if result is not None:
+                if needs_refresh:
+                    self._spawn(key, query, params)
+                return result
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = self._spawn(key, query, params)
+
+        # The query runs in a task of its own and every caller, the first one
+        # included, only waits for it: a cancelled caller (e.g. the client went
+        # away) cannot cancel or fail the execution the others are waiting on
+        return await asyncio.shield(future)
+
+    def _spawn(self, key, query, params):
+        future, generation = self._lead(key)
+        task = asyncio.ensure_future(self._execute(key, future, generation, query, params))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return future
+
+    def _lead(self, key):
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executions += 1
+        return future, self._generation
+
+    async def _execute(self, key, future, generation, query, params):
+        # Waiters are released even if the task itself is cancelled (e.g. at shutdown)
+        result = {'success': False, 'error': 'Query cancelled', 'messages': []}
+        try:
+            result = await self.db.execute_query(query, params)
+        except Exception as e:
+            print(f"!!! ERROR in single-flight query: {e}")
+            result = {'success': False, 'error': str(e), 'messages': []}
+        finally:
+            self._finish(key, future, result, generation)
+            future.set_result(result)
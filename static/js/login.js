@@ -0,0 +1,44 @@
+// This script handles the login form submission to your API
+document.getElementById('login-form').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const form = e.target;
+    const messageEl = document.getElementById('message');
+
+    const data = {
+        role: form.role.value
+    };
+
+    if (data.role === 'admin') {
+        data.username = form.username.value;
+        data.password = form.password.value;
+    } else {
+        data.name = form.name.value;
+        data.email = form.email.value;
+    }
+
+    try {
+        const response = await fetch('/api/login', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            messageEl.textContent = 'Login successful! Redirecting...';
+            messageEl.className = 'alert alert-success';
+            messageEl.style.display = 'block';
+            window.location.href = result.redirect; // Redirect to dashboard
+        } else {
+            messageEl.textContent = 'Error: ' + result.error;
+            messageEl.className = 'alert alert-error';
+            messageEl.style.display = 'block';
+        }
+    } catch (err) {
+        messageEl.textContent = 'An error occurred. Please try again.';
+        messageEl.className = 'alert alert-error';
+        messageEl.style.display = 'block';
+    }
+});
@@ -0,0 +1,58 @@
+// This is your exact JS from your file, with one change:
+// Instead of alert(), it will show a message on the page.
+
+document.getElementById('role').addEventListener('change', function() {
+    document.getElementById('ownerFields').style.display = 
+        this.value === 'owner' ? 'block' : 'none';
+    document.getElementById('tenantFields').style.display = 
+        this.value === 'tenant' ? 'block' : 'none';
+});
+
+document.getElementById('signupForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const role = document.getElementById('role').value;
+    const messageEl = document.getElementById('message');
+
+    const data = {
+        role: role,
+        name: document.getElementById('name').value,
+        email: document.getElementById('email').value,
+        phone: document.getElementById('phone').value
+    };
+
+    if (role === 'owner') {
+        data.bank_details = document.getElementById('bank_details').value;
+    } else if (role === 'tenant') {
+        data.id_proof = document.getElementById('id_proof').value;
+    }
+
+    try {
+        const response = await fetch('/api/signup', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            messageEl.textContent = result.message || 'Account created successfully! Redirecting...';
+            messageEl.className = 'alert alert-success';
+            messageEl.style.display = 'block';
+
+            setTimeout(() => {
+                // Redirects to the login form for the role they just created
+                window.location.href = '/login-form/' + role;
+            }, 2000);
+        } else {
+            messageEl.textContent = 'Signup failed: ' + (result.error || 'Unknown error');
+            messageEl.className = 'alert alert-error';
+            messageEl.style.display = 'block';
+        }
+    } catch (error) {
+        messageEl.textContent = 'Signup failed: ' + error.message;
+        messageEl.className = 'alert alert-error';
+        messageEl.style.display = 'block';
+    }
+});
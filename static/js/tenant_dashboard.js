@@ -0,0 +1,377 @@
+// --- Global Variables ---
+const allNavLinks = document.querySelectorAll('.sidebar-nav .nav-link');
+const allContentSections = document.querySelectorAll('.content-section');
+const pageTitle = document.getElementById('page-title');
+
+// Modals
+const paymentModal = document.getElementById('payment-modal');
+const historyModal = document.getElementById('history-modal');
+const reviewModal = document.getElementById('review-modal');
+
+// Forms
+const paymentForm = document.getElementById('payment-form');
+const reviewForm = document.getElementById('review-form');
+
+// --- View Switching Logic ---
+function showView(viewId) {
+    allContentSections.forEach(section => section.classList.remove('active'));
+    allNavLinks.forEach(link => link.classList.remove('active'));
+
+    const targetSection = document.getElementById(viewId + '-view');
+    if (targetSection) targetSection.classList.add('active');
+
+    const targetLink = document.querySelector(`.nav-link[data-view="${viewId}"]`);
+    if (targetLink) {
+        targetLink.classList.add('active');
+        pageTitle.textContent = targetLink.textContent;
+    }
+
+    // --- View-Specific Logic ---
+    if (viewId === 'dashboard') loadDashboardStats();
+    if (viewId === 'rentals') loadMyRentals();
+    if (viewId === 'browse') loadBrowsableProperties();
+}
+
+allNavLinks.forEach(link => {
+    link.addEventListener('click', (e) => {
+        e.preventDefault();
+        const viewId = link.getAttribute('data-view');
+        showView(viewId);
+    });
+});
+
+// --- Data Loading Functions ---
+document.addEventListener('DOMContentLoaded', () => {
+    loadDashboardStats(); // Load stats on initial page load
+});
+
+// 1. Load Dashboard Stats
+async function loadDashboardStats() {
+    const container = document.getElementById('dashboard-cards-container');
+    container.innerHTML = '<p>Loading stats...</p>';
+    try {
+        const response = await fetch('/api/tenant/ledger'); // Summary rows are enough here
+        const result = await response.json();
+        if (result.success && result.data.length > 0) {
+            const currentRental = result.data.find(r => r.end_date === null);
+
+            container.innerHTML = ''; // Clear
+
+            if (currentRental) {
+                container.innerHTML += `
+                    <div class="card card-green">
+                        <h3>Current Rental</h3>
+                        <p>${currentRental.address}, ${currentRental.city}</p>
+                    </div>
+                `;
+                if (currentRental.rent_due) {
+                     container.innerHTML += `
+                        <div class="card card-red">
+                            <h3>Rent Status</h3>
+                            <p>Rent is due for ${new Date().toLocaleString('default', { month: 'long' })}!</p>
+                        </div>
+                    `;
+                } else {
+                     container.innerHTML += `
+                        <div class="card card-green">
+                            <h3>Rent Status</h3>
+                            <p>You are all paid up!</p>
+                        </div>
+                    `;
+                }
+            } else {
+                container.innerHTML = `
+                    <div class="card">
+                        <h3>No Current Rental</h3>
+                        <p>You are not currently renting. Click "Browse Properties" to find a new home.</p>
+                    </div>
+                `;
+            }
+        } else {
+            container.innerHTML = `<p>Welcome! Click "Browse Properties" to find a home.</p>`;
+        }
+    } catch(err) {
+        container.innerHTML = `<p style="color: red;">Error loading dashboard.</p>`;
+    }
+}
+
+// 2. Load "My Rentals" (Current & Past)
+async function loadMyRentals() {
+    const listContainer = document.getElementById('rentals-list');
+    listContainer.innerHTML = '<p style="text-align:center;">Loading...</p>';
+    try {
+        const response = await fetch('/api/tenant/ledger');
+        const result = await response.json();
+        listContainer.innerHTML = ''; // Clear loading
+
+        if (result.success && result.data.length > 0) {
+            result.data.forEach(prop => {
+                const rent = parseFloat(prop.monthly_rent);
+                let statusHTML = '';
+
+                if (prop.end_date === null) { // Current Rental
+                    statusHTML = `<span class="status-badge status-rented">Current Rental</span>`;
+                } else { // Past Rental
+                    statusHTML = `<span class="status-badge status-past">Ended: ${new Date(prop.end_date).toLocaleDateString()}</span>`;
+                }
+
+                listContainer.innerHTML += `
+                    <div class="property-card">
+                        <div class="property-card-content">
+                            <div class="detail-block">
+                                <h4>${prop.address}, ${prop.city}</h4>
+                                <p><strong>Owner:</strong> ${prop.owner_name}</p>
+                                <p><strong>Owner Phone:</strong> ${prop.owner_phone}</p>
+                                <p><strong>Rent:</strong> ₹${rent.toFixed(2)} /mo</p>
+                                <p><strong>Start Date:</strong> ${new Date(prop.start_date).toLocaleDateString()}</p>
+                                ${statusHTML}
+                            </div>
+                            <div class="detail-block">
+                                <h4>Actions</h4>
+                                ${prop.end_date === null && prop.rent_due ? 
+                                    `<button class="btn btn-red" style="width:100%;" onclick="openPaymentModal(${prop.occupancy_id}, ${rent})">
+                                        Pay Rent Now
+                                    </button>` : ''
+                                }
+                                <button class="btn btn-blue" style="width:100%; margin-top: 10px;" onclick="openHistoryModal(${prop.occupancy_id}, '${prop.start_date}')">
+                                    View Payment History
+                                </button>
+                                <button class="btn btn-grey" style="width:100%; margin-top: 10px;" onclick="openReviewModal(${prop.property_id})">
+                                    Write Review
+                                </button>
+                            </div>
+                        </div>
+                    </div>
+                `;
+            });
+        } else {
+            listContainer.innerHTML = '<p style="text-align:center;">You have no rental history.</p>';
+        }
+    } catch (err) {
+         listContainer.innerHTML = `<p style="text-align:center; color: red;">Error: ${err.message}</p>`;
+    }
+}
+
+// 3. Load "Browse Properties"
+async function loadBrowsableProperties() {
+    const listContainer = document.getElementById('browse-list');
+    listContainer.innerHTML = '<p style="text-align:center;">Loading...</p>';
+    try {
+        const response = await fetch('/api/properties/browse');
+        const result = await response.json();
+        listContainer.innerHTML = ''; // Clear loading
+
+        if (result.success && result.data.length > 0) {
+            const availableProps = result.data.filter(p => p.status === 'Available');
+            if (availableProps.length === 0) {
+                listContainer.innerHTML = '<p style="text-align:center;">No properties are available for rent right now.</p>';
+                return;
+            }
+
+            availableProps.forEach(prop => {
+                const rent = parseFloat(prop.monthly_rent);
+                const rating = prop.avg_rating ? `${parseFloat(prop.avg_rating).toFixed(1)} ⭐` : 'N/A';
+
+                listContainer.innerHTML += `
+                    <div class="property-card">
+                        <div class="property-card-content">
+                            <div class="detail-block">
+                                <h4>${prop.address}, ${prop.city}</h4>
+                                <p><strong>Owner:</strong> ${prop.owner_name}</p>
+                                <p><strong>Owner Phone:</strong> ${prop.owner_phone}</p>
+                                <p><strong>Rent:</strong> ₹${rent.toFixed(2)} /mo</p>
+                                <p><strong>Rating:</strong> ${rating}</p>
+                            </div>
+                            <div class="detail-block">
+                                <h4>Manage</h4>
+                                <p>${prop.description}</p>
+                                <span class="status-badge status-available">Available</span>
+                                <button class="btn btn-green" style="width:100%; margin-top: 10px;" onclick="handleRequestToRent(${prop.property_id})">
+                                    Request to Rent
+                                </button>
+                            </div>
+                        </div>
+                    </div>
+                `;
+            });
+        } else {
+            listContainer.innerHTML = '<p style="text-align:center;">No properties found.</p>';
+        }
+    } catch (err) {
+         listContainer.innerHTML = `<p style="text-align:center; color: red;">Error: ${err.message}</p>`;
+    }
+}
+
+// --- Modal & Form Handling ---
+
+function closeModal(modalId) {
+    document.getElementById(modalId).classList.remove('show');
+}
+
+// --- Payment Logic ---
+function openPaymentModal(occupancyId, amount) {
+    const currentMonthYear = new Date().strftime('%Y-%m');
+    paymentForm.reset();
+    document.getElementById('payment-occupancy-id').value = occupancyId;
+    document.getElementById('payment-amount').value = `₹${amount.toFixed(2)}`;
+    document.getElementById('payment-month-year').value = currentMonthYear;
+    paymentModal.classList.add('show');
+}
+
+paymentForm.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const data = {
+        occupancy_id: document.getElementById('payment-occupancy-id').value,
+        amount: parseFloat(document.getElementById('payment-amount').value.replace('₹', '')),
+        month_year: document.getElementById('payment-month-year').value,
+        method: document.getElementById('payment-method').value
+    };
+
+    try {
+        const response = await fetch('/api/tenant/make_payment', { // NEW API Route
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+        const result = await response.json();
+
+        if (result.success) {
+            showToast(result.message);
+            closeModal('payment-modal');
+            loadMyRentals();
+            loadDashboardStats();
+        } else {
+            showToast('Error: ' + result.error, true);
+        }
+    } catch (err) {
+        showToast('Error: ' + err.message, true);
+    }
+});
+
+// --- Payment History Logic ---
+// The modal pages through one occupancy's payments since its start date
+let historyQuery = null;
+let historyPage = 0;
+
+function openHistoryModal(occupancyId, startDate) {
+    const from = new Date(startDate).toISOString().slice(0, 10);
+    historyQuery = `occupancy_id=${occupancyId}&from=${from}&per_page=50`;
+    historyPage = 0;
+    document.getElementById('payment-history-table-body').innerHTML =
+        '<tr><td colspan="5" style="text-align:center;">Loading...</td></tr>';
+    historyModal.classList.add('show');
+    loadHistoryPage();
+}
+
+async function loadHistoryPage() {
+    const tableBody = document.getElementById('payment-history-table-body');
+    const loadMoreBtn = document.getElementById('history-load-more');
+    loadMoreBtn.style.display = 'none';
+
+    try {
+        const response = await fetch(`/api/tenant/payments?${historyQuery}&page=${historyPage + 1}`);
+        const result = await response.json();
+        if (!result.success) {
+            throw new Error(result.error || 'Could not load payment history.');
+        }
+        if (historyPage === 0) {
+            tableBody.innerHTML = ''; // Clear
+        }
+        historyPage = result.page;
+        result.data.forEach(p => {
+            tableBody.innerHTML += `
+                <tr>
+                    <td>${new Date(p.payment_date).toLocaleDateString()}</td>
+                    <td>₹${parseFloat(p.amount).toFixed(2)}</td>
+                    <td>${p.month_year}</td>
+                    <td>${p.method}</td>
+                    <td><span class="status-badge ${p.status === 'Paid' ? 'status-available' : 'status-rented'}">${p.status}</span></td>
+                </tr>
+            `;
+        });
+        if (tableBody.children.length === 0) {
+            tableBody.innerHTML = '<tr><td colspan="5" style="text-align:center;">No payment history found.</td></tr>';
+        }
+        loadMoreBtn.style.display = result.has_more ? 'block' : 'none';
+    } catch(err) {
+        tableBody.innerHTML = `<tr><td colspan="5" style="text-align:center; color:red;">${err.message}</td></tr>`;
+    }
+}
+
+// --- Review Logic ---
+function openReviewModal(propertyId) {
+    reviewForm.reset();
+    document.getElementById('review-property-id').value = propertyId;
+    reviewModal.classList.add('show');
+}
+
+reviewForm.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const data = {
+        property_id: document.getElementById('review-property-id').value,
+        rating: document.getElementById('review-rating').value,
+        comment: document.getElementById('review-comment').value
+    };
+
+    try {
+        const response = await fetch('/api/tenant/review', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+        const result = await response.json();
+
+        if (result.success) {
+            showToast(result.message);
+            closeModal('review-modal');
+        } else {
+            showToast('Error: ' + result.error, true);
+        }
+    } catch (err) {
+        showToast('Error: ' + err.message, true);
+    }
+});
+
+// --- Request to Rent Logic ---
+async function handleRequestToRent(propertyId) {
+    if (!confirm('Are you sure you want to request to rent this property?')) {
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/tenant/request-rent', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ property_id: propertyId })
+        });
+        const result = await response.json();
+
+        if (result.success) {
+            showToast(result.message);
+            showView('rentals'); // Go to "My Rentals" page
+        } else {
+            showToast('Error: ' + result.error, true);
+        }
+    } catch (err) {
+        showToast('Error: ' + err.message, true);
+    }
+}
+
+// --- Success/Error Popup (Toast) ---
+function showToast(message, isError = false) {
+    const toast = document.getElementById('toast-notification');
+    toast.textContent = message;
+    toast.style.background = isError ? '#e74c3c' : '#2ecc71'; 
+
+    toast.classList.add('show');
+
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 3000);
+}
+
+// Helper for date formatting
+Date.prototype.strftime = function(format) {
+    var date = this;
+    return format.replace('%Y', date.getFullYear()).replace('%m', ('0' + (date.getMonth() + 1)).slice(-2));
+};
@@ -0,0 +1,60 @@
+"""Regression tests for the asset minifiers (python -m pytest)"""
+from assets import minify_css, minify_js
+
+
+# ==================== CSS ====================
+
+def test_css_collapses_whitespace_and_comments():
+    css = "a ,  b {\n  color : red ;\n  /* note */\n  margin: 0 ;\n}\n"
+    assert minify_css(css) == "a,b{color :red;margin:0}"
+
+
+def test_css_keeps_quoted_strings():
+    css = 'a::after { content: "a  ;  b > c"; }'
+    assert minify_css(css) == 'a::after{content:"a  ;  b > c"}'
+
+
+def test_css_keeps_comment_markers_and_quotes_inside_strings():
+    css = "a { content: '/* not a comment */'; } /* it's a comment */ b { content: \"x\\\"  y\"; }"
+    assert minify_css(css) == "a{content:'/* not a comment */'}b{content:\"x\\\"  y\"}"
+
+
+# ==================== JS ====================
+
+def test_js_drops_comments_and_indentation():
+    js = "function f() {\n    // line comment\n    return 1; /* block */\n}\n"
+    assert minify_js(js) == "function f() {\nreturn 1;\n}\n"
+
+
+def test_js_keeps_line_breaks_for_asi():
+    js = "let a = b\n\n(c || d).run()\nreturn\nvalue\n"
+    assert minify_js(js) == "let a = b\n(c || d).run()\nreturn\nvalue\n"
+
+
+def test_js_multiline_block_comment_still_ends_the_statement():
+    assert minify_js("a = 1 /* one\ntwo */ b = 2\n") == "a = 1\nb = 2\n"
+
+
+def test_js_keeps_comment_markers_inside_strings():
+    js = "const url = 'http://example.com/*path*/'; const s = \"// not a comment\";\n"
+    assert minify_js(js) == js
+
+
+def test_js_keeps_regex_literals():
+    js = "const re = /\\/\\/[a-z]+/g; if (/[/]*\\s+/.test(x)) return x.split(/ +/);\n"
+    assert minify_js(js) == js
+
+
+def test_js_regex_after_keyword_but_division_after_value():
+    assert minify_js("return /a  b/.test(s)\n") == "return /a  b/.test(s)\n"
+    assert minify_js("x = total / count / 2\n") == "x = total / count / 2\n"
+
+
+def test_js_keeps_template_literals():
+    js = "const html = `<p>  ${ user.name }  // kept\n  /* kept */ ${ {a: 1}.a }</p>`;\n"
+    assert minify_js(js) == js
+
+
+def test_js_nested_template_literal_inside_expression():
+    js = "const t = `a ${ items.map(i => `  <li>${i}</li>`).join('') } b`;\n"
+    assert minify_js(js) == js